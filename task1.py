@@ -1,49 +1,309 @@
+import heapq
+from typing import Iterable, Iterator
+
+_WHOLE_LIST = object()  # типове значення head у merge_sort: явний None — порожній ланцюг
+
+
+def _identity(x):
+    return x
+
+
 class Node:
+    __slots__ = ("data", "next")
+
     def __init__(self, data=None):
         self.data = data
         self.next = None
 
 
 class LinkedList:
-    def __init__(self):
-        self.head = None
+    """
+    Однозв'язний список із вказівником на хвіст і кешованою довжиною.
+    Якщо голову змінено напряму (list.head = ...), хвіст і довжина
+    перераховуються ліниво одним проходом при наступному зверненні.
+
+    indexed=True вмикає хеш-індекс: значення → купа його вузлів, вузол →
+    попередник і вузол → мітка порядку. Мітки зростають уздовж списку, тож
+    вершина купи — перше входження значення. search_element працює за O(1),
+    delete_node і вставки — за O(1) для унікальних значень та O(log k) для k
+    дублікатів, без проходів по списку; значення мають бути хешованими.
+    Якщо між сусідами не лишилось вільної мітки, перемічується лише найменший
+    достатньо розріджений блок навколо місця вставки (амортизовано O(log n)).
+    Ціна — три словники та O(n) перебудова після reverse/сортування/злиттів.
+    """
+
+    _LABEL_GAP = 1 << 32
+    _DENSITY = 1.5
+
+    def __init__(self, iterable: Iterable | None = None, indexed: bool = False):
+        self._head: Node | None = None
+        self._tail: Node | None = None
+        self._size = 0
+        self._dirty = False
+        self._index: dict | None = {} if indexed else None
+        self._prev: dict | None = {} if indexed else None
+        self._order: dict | None = {} if indexed else None
+        if iterable is not None:
+            self.extend(iterable)
+
+    @classmethod
+    def from_iterable(cls, iterable: Iterable, indexed: bool = False) -> "LinkedList":
+        """Будує список з ітерованого джерела за O(n)."""
+        return cls(iterable, indexed=indexed)
+
+    @property
+    def indexed(self) -> bool:
+        return self._index is not None
+
+    @property
+    def head(self) -> Node | None:
+        return self._head
+
+    @head.setter
+    def head(self, node: Node | None) -> None:
+        if node is not self._head:
+            self._head = node
+            self._dirty = True
+
+    @property
+    def tail(self) -> Node | None:
+        self._sync()
+        return self._tail
+
+    def _sync(self) -> None:
+        """Перераховує хвіст, довжину (та індекс) після прямої зміни ланцюга."""
+        if not self._dirty:
+            return
+        tail, size, cur = None, 0, self._head
+        while cur:
+            tail, size, cur = cur, size + 1, cur.next
+        self._tail, self._size, self._dirty = tail, size, False
+        self._reindex()
+
+    def _set_chain(self, head: Node | None, tail: Node | None, size: int) -> None:
+        self._head, self._tail, self._size, self._dirty = head, tail, size, False
+        self._reindex()
+
+    def _reindex(self) -> None:
+        """Повна перебудова індексу за O(n) (лише в indexed-режимі)."""
+        if self._index is None:
+            return
+        index, prev_map, order = {}, {}, {}
+        prev, cur, label = None, self._head, 0
+        while cur:
+            # мітки зростають, тож append зберігає властивість купи
+            index.setdefault(cur.data, []).append(cur)
+            prev_map[cur] = prev
+            order[cur] = label
+            prev, cur, label = cur, cur.next, label + self._LABEL_GAP
+        self._index, self._prev, self._order = index, prev_map, order
+
+    def _bucket_push(self, bucket: list, node: Node) -> None:
+        """Додає node у купу вузлів одного значення (ключ — мітка порядку)."""
+        order = self._order
+        key = order[node]
+        bucket.append(node)
+        pos = len(bucket) - 1
+        while pos:
+            parent = (pos - 1) >> 1
+            up = bucket[parent]
+            if order[up] <= key:
+                break
+            bucket[pos] = up
+            pos = parent
+        bucket[pos] = node
+
+    def _bucket_pop(self, bucket: list) -> Node:
+        """Знімає з купи перше у списку входження значення."""
+        order = self._order
+        first, last = bucket[0], bucket.pop()
+        if bucket:
+            key, pos, n = order[last], 0, len(bucket)
+            child = 1
+            while child < n:
+                right = child + 1
+                if right < n and order[bucket[right]] < order[bucket[child]]:
+                    child = right
+                if key <= order[bucket[child]]:
+                    break
+                bucket[pos] = bucket[child]
+                pos, child = child, 2 * child + 1
+            bucket[pos] = last
+        return first
+
+    def _relabel(self, node: Node) -> None:
+        """
+        Рівномірно перемічує найменший вирівняний блок міток навколо node,
+        щільність якого не перевищує DENSITY**-i (схема Bender et al.).
+        Відносний порядок вузлів не змінюється, тож купи лишаються коректними.
+        """
+        order, prev_map = self._order, self._prev
+        base, i = order[node], 0
+        while True:
+            i += 1
+            lo = (base >> i) << i
+            hi = lo + (1 << i)
+            first = node
+            while True:
+                prev = prev_map[first]
+                if prev is None or order[prev] < lo:
+                    break
+                first = prev
+            run, cur = [], first
+            while cur is not None and order[cur] < hi:
+                run.append(cur)
+                cur = cur.next
+            if len(run) * self._DENSITY ** i <= 1 << i:
+                break
+        step = (1 << i) // len(run)
+        for k, cur in enumerate(run):
+            order[cur] = lo + k * step
+
+    def _index_insert(self, node: Node, prev: Node | None) -> None:
+        """Реєструє щойно вставлений вузол node (з попередником prev) в індексі."""
+        prev_map, order = self._prev, self._order
+        nxt = node.next
+        prev_map[node] = prev
+        if nxt is not None:
+            prev_map[nxt] = node
+        if prev is None:
+            order[node] = order[nxt] - self._LABEL_GAP if nxt is not None else 0
+        elif nxt is None:
+            order[node] = order[prev] + self._LABEL_GAP
+        else:
+            lo, hi = order[prev], order[nxt]
+            order[node] = (lo + hi) >> 1
+            if hi - lo < 2:
+                # вільної мітки немає: node тимчасово ділить мітку з prev
+                self._relabel(node)
+        self._bucket_push(self._index.setdefault(node.data, []), node)
+
+    def __len__(self) -> int:
+        self._sync()
+        return self._size
+
+    def __iter__(self) -> Iterator:
+        cur = self._head
+        while cur:
+            yield cur.data
+            cur = cur.next
+
+    def extend(self, iterable: Iterable) -> None:
+        """Додає всі елементи в кінець. O(k) для k нових елементів."""
+        self._sync()
+        it = iter(iterable)
+        if self._head is None:
+            for data in it:
+                self._head = self._tail = Node(data)
+                self._size = 1
+                if self._index is not None:
+                    self._index_insert(self._head, None)
+                break
+            else:
+                return
+        tail, added = self._tail, 0
+        index, prev_map, order = self._index, self._prev, self._order
+        label = order[tail] if index is not None else 0
+        for data in it:
+            node = Node(data)
+            tail.next = node
+            if index is not None:
+                label += self._LABEL_GAP
+                order[node] = label
+                prev_map[node] = tail
+                self._bucket_push(index.setdefault(data, []), node)
+            tail = node
+            added += 1
+        self._tail = tail
+        self._size += added
 
     def insert_at_beginning(self, data):
+        self._sync()
         new_node = Node(data)
-        new_node.next = self.head
-        self.head = new_node
+        new_node.next = self._head
+        if self._head is None:
+            self._tail = new_node
+        self._head = new_node
+        self._size += 1
+        if self._index is not None:
+            self._index_insert(new_node, None)
 
     def insert_at_end(self, data):
+        self._sync()
         new_node = Node(data)
-        if self.head is None:
-            self.head = new_node
+        prev = self._tail
+        if self._head is None:
+            self._head = new_node
         else:
-            cur = self.head
-            while cur.next:
-                cur = cur.next
-            cur.next = new_node
+            self._tail.next = new_node
+        self._tail = new_node
+        self._size += 1
+        if self._index is not None:
+            self._index_insert(new_node, prev)
 
     def insert_after(self, prev_node: Node, data):
         if prev_node is None:
             print("Попереднього вузла не існує.")
             return
+        self._sync()
         new_node = Node(data)
         new_node.next = prev_node.next
         prev_node.next = new_node
+        if prev_node is self._tail:
+            self._tail = new_node
+        self._size += 1
+        if self._index is not None:
+            self._index_insert(new_node, prev_node)
 
     def delete_node(self, key: int) -> None:
-        cur, prev = self.head, None
+        if self._index is not None:
+            self._delete_indexed(key)
+            return
+        cur, prev = self._head, None
         if cur and cur.data == key:
-            self.head = cur.next
+            self._head = cur.next
+            if self._head is None:
+                self._tail = None
+            self._size -= 1
             return
         while cur and cur.data != key:
             prev, cur = cur, cur.next
         if cur is None:
             return
         prev.next = cur.next
+        if cur is self._tail:
+            self._tail = prev
+        self._size -= 1
+
+    def _delete_indexed(self, key) -> None:
+        """Видалення першого вузла зі значенням key: O(1) для унікальних, O(log k) для k дублікатів."""
+        self._sync()
+        bucket = self._index.get(key)
+        if not bucket:
+            return
+        node = self._bucket_pop(bucket)
+        if not bucket:
+            del self._index[key]
+        del self._order[node]
+        prev = self._prev.pop(node)
+        nxt = node.next
+        if prev is None:
+            self._head = nxt
+        else:
+            prev.next = nxt
+        if nxt is not None:
+            self._prev[nxt] = prev
+        if node is self._tail:
+            self._tail = prev
+        node.next = None
+        self._size -= 1
 
     def search_element(self, data: int) -> Node | None:
-        cur = self.head
+        if self._index is not None:
+            self._sync()
+            bucket = self._index.get(data)
+            return bucket[0] if bucket else None
+        cur = self._head
         while cur:
             if cur.data == data:
                 return cur
@@ -51,7 +311,7 @@ class LinkedList:
         return None
 
     def print_list(self):
-        current = self.head
+        current = self._head
         while current:
             print(current.data, "-->", end="")
             current = current.next
@@ -60,26 +320,140 @@ class LinkedList:
     def reverse(self):
         """Реверс однозв'язного списку in-place. O(n) часу, O(1) пам'яті."""
         prev = None
-        cur = self.head
+        cur = self._head
+        self._tail = cur
         while cur:
             nxt = cur.next
             cur.next = prev
             prev = cur
             cur = nxt
-        self.head = prev
+        self._head = prev
+        self._reindex()
 
-    def merge_sort(self, head):
+    def merge_sort(self, head=_WHOLE_LIST, key=None):
         """
-        Рекурсивне сортування злиттям для однозв'язного списку.
-        Приймає голову підсписку, повертає відсортовану голову.
+        Ітеративне природне сортування злиттям (у стилі Timsort), без рекурсії.
+        Один прохід ділить ланцюг на вже впорядковані серії (строго спадні
+        розвертаються), а серії зливаються зі стеку за інваріантами Timsort —
+        майже відсортовані дані сортуються майже за O(n).
+        Стабільне; key — як у sorted(). Стек серій — O(log n), решта O(1).
+        Приймає голову підсписку, повертає відсортовану голову (для None — None).
+        Без аргументу (або з head is self.head) сортує сам список
+        і оновлює голову та хвіст.
         """
-        if head is None or head.next is None:
-            return head
+        if head is None:
+            return None
+        if head is _WHOLE_LIST or head is self._head:
+            self._sync()
+            new_head, new_tail = self._merge_sort(self._head, key)
+            self._set_chain(new_head, new_tail, self._size)
+            return new_head
+        return self._merge_sort(head, key)[0]
+
+    def _merge_sort(self, head, key=None):
+        """Сортує ланцюг від head, повертає (голова, хвіст)."""
+        stack = []  # серії: (голова, хвіст, довжина)
+        cur = head
+        while cur is not None:
+            run_head, run_tail, length, cur = self._next_run(cur, key)
+            stack.append((run_head, run_tail, length))
+            while len(stack) > 1:
+                n = len(stack)
+                if (n >= 3 and stack[-3][2] <= stack[-2][2] + stack[-1][2]) or \
+                        (n >= 4 and stack[-4][2] <= stack[-3][2] + stack[-2][2]):
+                    self._merge_at(stack, -3 if stack[-3][2] < stack[-1][2] else -2, key)
+                elif stack[-2][2] <= stack[-1][2]:
+                    self._merge_at(stack, -2, key)
+                else:
+                    break
+        while len(stack) > 1:
+            self._merge_at(stack, -2, key)
+        return (stack[0][0], stack[0][1]) if stack else (None, None)
+
+    @staticmethod
+    def _next_run(cur, key=None):
+        """
+        Відрізає від cur максимальну впорядковану серію.
+        Строго спадну серію розвертає (рівні елементи не переставляються — стабільність).
+        Повертає (голова, хвіст, довжина, решта ланцюга).
+        """
+        k = key if key is not None else _identity
+        nxt = cur.next
+        cur.next = None
+        if nxt is None:
+            return cur, cur, 1, None
+        last, nk = k(cur.data), k(nxt.data)
+        length = 1
+        if nk < last:
+            run_head = cur
+            while True:
+                rest = nxt.next
+                nxt.next = run_head
+                run_head, last, length = nxt, nk, length + 1
+                nxt = rest
+                if nxt is None:
+                    break
+                nk = k(nxt.data)
+                if not nk < last:
+                    break
+            return run_head, cur, length, nxt
+        tail = cur
+        while True:
+            tail.next = nxt
+            tail, last, length = nxt, nk, length + 1
+            nxt = nxt.next
+            if nxt is None:
+                break
+            nk = k(nxt.data)
+            if nk < last:
+                break
+        tail.next = None
+        return cur, tail, length, nxt
 
-        mid = self.get_middle(head)  # mid — голова ПРАВОЇ половини; ліва вже відрізана
-        left_sorted = self.merge_sort(head)
-        right_sorted = self.merge_sort(mid)
-        return self.sorted_merge(left_sorted, right_sorted)
+    def _merge_at(self, stack, i, key=None):
+        """Зливає сусідні серії stack[i] і stack[i+1]."""
+        a, b = stack[i], stack[i + 1]
+        head, tail = self._merge_chains(a[0], a[1], b[0], b[1], key)
+        stack[i] = (head, tail, a[2] + b[2])
+        del stack[i + 1]
+
+    @staticmethod
+    def _merge_chains(a, a_tail, b, b_tail, key=None):
+        """
+        Ітеративне стабільне злиття ланцюгів a і b (при рівності — спершу a).
+        Повертає (голова, хвіст); хвіст None, якщо a_tail/b_tail невідомі.
+        """
+        dummy = tail = Node()
+        if key is None:
+            while a is not None and b is not None:
+                if b.data < a.data:
+                    tail.next = tail = b
+                    b = b.next
+                else:
+                    tail.next = tail = a
+                    a = a.next
+        elif a is not None and b is not None:
+            ka, kb = key(a.data), key(b.data)
+            while True:
+                if kb < ka:
+                    tail.next = tail = b
+                    b = b.next
+                    if b is None:
+                        break
+                    kb = key(b.data)
+                else:
+                    tail.next = tail = a
+                    a = a.next
+                    if a is None:
+                        break
+                    ka = key(a.data)
+        if a is not None:
+            tail.next, tail = a, a_tail
+        elif b is not None:
+            tail.next, tail = b, b_tail
+        elif tail is dummy:
+            tail = None
+        return dummy.next, tail
 
     def get_middle(self, head):
         """
@@ -101,31 +475,66 @@ class LinkedList:
             prev.next = None
         return slow
 
-    def sorted_merge(self, a, b):
+    def sorted_merge(self, a, b, key=None):
         """Злиття двох відсортованих ланцюгів вузлів, повертає голову результату."""
+        return self._merge_chains(a, None, b, None, key)[0]
 
-        if a is None:
-            return b
-        if b is None:
-            return a
-
-        if a.data <= b.data:
-            result = a
-            result.next = self.sorted_merge(a.next, b)
-        else:
-            result = b
-            result.next = self.sorted_merge(a, b.next)
-
-        return result
-
-    def merge_sorted_lists(self, list1, list2):
+    def merge_sorted_lists(self, list1, list2, key=None):
         """
         Об'єднує два ВІДСОРТОВАНІ списки list1 і list2 у self.
         Результат створюється перелінковуванням вузлів (без копій).
         """
-        self.head = self.sorted_merge(list1.head, list2.head)
+        size = len(list1) + len(list2)
+        head, tail = self._merge_chains(list1.head, list1.tail, list2.head, list2.tail, key)
+        # вузли джерел тепер належать self — їхні кеші більше не дійсні
+        list1._dirty = list2._dirty = True
+        self._set_chain(head, tail, size)
         return self
 
+    def merge_k_sorted(self, sources: Iterable, key=None):
+        """
+        K-шляхове злиття будь-якої кількості ВІДСОРТОВАНИХ джерел у self через купу.
+        Джерела — LinkedList (вузли перелінковуються без копій) або довільні
+        відсортовані ітеровані/генератори (для них створюються нові вузли).
+        Стабільне: при рівних ключах раніше йде елемент з ранішого джерела.
+        Час: O(total · log k), додаткова пам'ять: O(k).
+        """
+        sources = list(sources)
+        node_key = (lambda nd: nd.data) if key is None else (lambda nd: key(nd.data))
+        dummy = tail = Node()
+        size = 0
+        for node in heapq.merge(*map(_iter_source_nodes, sources), key=node_key):
+            tail.next = tail = node
+            size += 1
+        tail.next = None
+        for src in sources:
+            if isinstance(src, LinkedList):
+                src._dirty = True
+        self._set_chain(dummy.next, tail if size else None, size)
+        return self
+
+
+def _iter_source_nodes(src) -> Iterator[Node]:
+    """Вузли джерела для merge_k_sorted: наявні для LinkedList, нові — для решти."""
+    if isinstance(src, LinkedList):
+        cur = src.head
+        while cur is not None:
+            nxt = cur.next  # запам'ятати до того, як вузол буде перелінковано
+            yield cur
+            cur = nxt
+    else:
+        for data in src:
+            yield Node(data)
+
+
+def iter_merge_sorted(sources: Iterable, key=None) -> Iterator:
+    """
+    Ліниве k-шляхове злиття: по одному видає значення з відсортованих джерел
+    (LinkedList або ітеровані), не будуючи результуючий список.
+    Час: O(total · log k), пам'ять: O(k).
+    """
+    return heapq.merge(*(iter(src) for src in sources), key=key)
+
 
 if __name__ == '__main__':
     first_list = LinkedList()
@@ -154,3 +563,6 @@ if __name__ == '__main__':
     merged = LinkedList().merge_sorted_lists(first_list, second_list)
     print("Злиття двох відсортованих списків:")
     merged.print_list()
+
+    shards = [LinkedList([1, 4, 9]), range(0, 12, 3), iter([2, 5, 8])]
+    print("K-шляхове ліниве злиття:", list(iter_merge_sorted(shards)))
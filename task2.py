@@ -1,7 +1,9 @@
 import math
 import time
 import turtle
-from typing import Optional, Any
+from typing import Optional, Any, Iterator, Tuple
+
+import numpy as np
 
 
 def pythagoras_tree(
@@ -37,6 +39,184 @@ def pythagoras_tree(
     pythagoras_tree(t, x2, y2, new_len, angle - 45, level - 1, k, animate, pause, screen)
 
 
+def iter_pythagoras_segments(
+    x: float,
+    y: float,
+    length: float,
+    angle: float,
+    level: int,
+    k: float = math.sqrt(2) / 2,
+    min_length: float = 0.0,
+    viewport: Optional[Tuple[float, float, float, float]] = None,
+) -> Iterator[Tuple[int, float, float, float, float]]:
+    """
+    Лінивий генератор сегментів без рекурсії, в ширину (рівень за рівнем).
+    Видає (i, x1, y1, x2, y2), де i — номер рівня (0 — перша гілка).
+    Відсікання (level of detail):
+      - min_length: гілки, коротші за min_length (у пікселях), не малюються
+        разом з усім піддеревом — їх однаково не видно;
+      - viewport=(xmin, ymin, xmax, ymax): піддерево відкидається, якщо
+        коло, що гарантовано його містить (радіус L/(1-k)), не перетинає вікно.
+    Кількість сегментів обмежена розміром вікна і min_length, а не 2**level.
+    Усі кути — це angle + m·45°, тож напрямки беруться з таблиці на 8 векторів.
+    """
+    if level <= 0 or length <= 0:
+        return
+
+    dirs = [
+        (math.cos(math.radians(angle + 45 * m)), math.sin(math.radians(angle + 45 * m)))
+        for m in range(8)
+    ]
+    reach = 1 / (1 - k) if k < 1 else math.inf  # сума геом. ряду довжин піддерева
+
+    def visible(px: float, py: float, seg_len: float) -> bool:
+        if viewport is None:
+            return True
+        xmin, ymin, xmax, ymax = viewport
+        r = seg_len * reach
+        dx = max(xmin - px, 0.0, px - xmax)
+        dy = max(ymin - py, 0.0, py - ymax)
+        return dx * dx + dy * dy <= r * r
+
+    frontier = [(x, y, 0)] if visible(x, y, length) else []  # (x, y, індекс напрямку m)
+    for i in range(level):
+        seg_len = length * k**i
+        if seg_len < min_length or not frontier:
+            return
+        child_len = seg_len * k
+        grow = i + 1 < level and child_len >= min_length
+        children = []
+        for x1, y1, m in frontier:
+            dx, dy = dirs[m]
+            x2, y2 = x1 + seg_len * dx, y1 + seg_len * dy
+            yield i, x1, y1, x2, y2
+            if grow and visible(x2, y2, child_len):
+                children.append((x2, y2, (m + 1) % 8))
+                children.append((x2, y2, (m - 1) % 8))
+        frontier = children
+
+
+def pythagoras_tree_batched(
+    t: turtle.Turtle,
+    x: float,
+    y: float,
+    length: float,
+    angle: float,
+    level: int,
+    k: float = math.sqrt(2) / 2,
+    screen: Optional[Any] = None,
+    batch: Optional[int] = None,
+    pause: float = 0.0,
+    min_length: float = 0.0,
+    viewport: Optional[Tuple[float, float, float, float]] = None,
+) -> None:
+    """
+    Той самий малюнок, що й pythagoras_tree, але в ширину (рівень за рівнем)
+    і з пакетним оновленням екрана: screen.update() раз на рівень (batch=None)
+    або раз на batch сегментів. Сегменти бере з iter_pythagoras_segments,
+    тож min_length/viewport обмежують роботу для глибоких рівнів.
+    """
+    drawn, cur_level = 0, 0
+    for i, x1, y1, x2, y2 in iter_pythagoras_segments(
+        x, y, length, angle, level, k, min_length=min_length, viewport=viewport
+    ):
+        if i != cur_level:
+            cur_level = i
+            if screen is not None:
+                screen.update()
+                if pause > 0:
+                    time.sleep(pause)
+        t.penup()
+        t.goto(x1, y1)
+        t.pendown()
+        t.goto(x2, y2)
+        drawn += 1
+        if batch and screen is not None and drawn % batch == 0:
+            screen.update()
+    if screen is not None:
+        screen.update()
+
+
+def pythagoras_tree_segments(
+    level: int,
+    length: float = 1.0,
+    angle: float = 90.0,
+    x: float = 0.0,
+    y: float = 0.0,
+    k: float = math.sqrt(2) / 2,
+    dtype=np.float64,
+) -> np.ndarray:
+    """
+    Безголова (без turtle) векторизована геометрія дерева Піфагора.
+    Кожен рівень будується цілком з кінців і кутів попереднього рівня:
+    2**i сегментів рівня i — одна операція NumPy замість 2**i викликів goto.
+    Повертає масив форми (2**level - 1, 2, 2): [[x1, y1], [x2, y2]] на сегмент,
+    рівні йдуть підряд від стовбура (first branch) до найдрібніших гілок.
+    """
+    if level <= 0 or length <= 0:
+        return np.empty((0, 2, 2), dtype=dtype)
+
+    segments = np.empty((2**level - 1, 2, 2), dtype=dtype)
+    starts = np.array([[x, y]], dtype=np.float64)
+    angles = np.array([math.radians(angle)])
+    turn = math.radians(45)
+    offset = 0
+    for i in range(level):
+        ends = starts + (length * k**i) * np.column_stack((np.cos(angles), np.sin(angles)))
+        n = len(angles)
+        segments[offset:offset + n, 0] = starts
+        segments[offset:offset + n, 1] = ends
+        offset += n
+        if i + 1 < level:
+            # діти кожної гілки: спершу +45°, потім -45° (як у рекурсивній версії)
+            starts = np.repeat(ends, 2, axis=0)
+            angles = (angles[:, None] + np.array([turn, -turn])).ravel()
+    return segments
+
+
+def render_pythagoras_tree(
+    path: Optional[str],
+    level: int,
+    length: float = 1.0,
+    angle: float = 90.0,
+    k: float = math.sqrt(2) / 2,
+    trunk_ratio: float = 0.30,
+    color: str = "#B8474C",
+    linewidth: float = 0.5,
+    figsize=(14, 9),
+    dpi: int = 150,
+):
+    """
+    Рендер дерева у файл (PNG/SVG/... за розширенням path) без дисплея:
+    усі сегменти — один LineCollection, matplotlib з Agg-канвою (pyplot не потрібен).
+    Якщо path=None — нічого не малює і повертає сирі сегменти.
+    """
+    trunk_length = length * trunk_ratio
+    segments = pythagoras_tree_segments(level, length, angle, 0.0, trunk_length, k)
+    if path is None:
+        return segments
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.collections import LineCollection
+    from matplotlib.figure import Figure
+
+    trunk = np.array([[[0.0, 0.0], [0.0, trunk_length]]], dtype=segments.dtype)
+    segs = np.concatenate((trunk, segments))
+    # одна ламана з NaN-розривами між сегментами: Agg малює її в ~10+ разів швидше,
+    # ніж мільйон окремих шляхів, а SVG отримує один елемент <path>
+    polyline = np.full((len(segs), 3, 2), np.nan, dtype=segs.dtype)
+    polyline[:, :2] = segs
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.add_axes((0, 0, 1, 1))
+    ax.axis("off")
+    ax.set_aspect("equal")
+    ax.add_collection(LineCollection([polyline.reshape(-1, 2)], colors=color, linewidths=linewidth))
+    ax.autoscale_view()
+    fig.savefig(path, dpi=dpi)
+    return segments
+
+
 def ask_level(default_level: int = 10) -> int:
     try:
         s = input(f"Введіть рівень рекурсії (8–12) [{default_level}]: ").strip()
@@ -73,7 +253,7 @@ def main() -> None:
     t.goto(start_x, start_y + trunk_length)
     screen.update()
 
-    pythagoras_tree(
+    pythagoras_tree_batched(
         t,
         start_x,
         start_y + trunk_length,
@@ -81,9 +261,11 @@ def main() -> None:
         90,
         level,
         k,
-        animate=True,     # ← покрокова анімація (True/False)
-        pause=0.01,
         screen=screen,
+        batch=None,       # ← None: оновлення раз на рівень; N: раз на N сегментів
+        pause=0.05,       # ← пауза між рівнями (дерево «росте» по рівнях)
+        min_length=1.0,   # ← гілки < 1px не малюються: рівень 25 теж завершується
+        viewport=(-SCREEN_W / 2, -SCREEN_H / 2, SCREEN_W / 2, SCREEN_H / 2),
     )
 
     screen.update()
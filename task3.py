@@ -1,17 +1,72 @@
-import heapq, matplotlib.pyplot as plt
-from collections import defaultdict
-from typing import Any, Dict, List, Tuple, Optional
+import heapq, math, os, struct, sys, matplotlib.pyplot as plt
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from itertools import accumulate, islice
+from typing import Any, Dict, List, NamedTuple, Tuple, Optional
 
 
 class Graph:
     def __init__(self):
         self.adj: Dict[Any, List[Tuple[Any, float]]] = defaultdict(list)
+        self._radj: Optional[Dict[Any, List[Tuple[Any, float]]]] = None
+        self.version = 0  # лічильник змін: кеші звіряються з ним
+        self._sp_cache: Optional[ShortestPathCache] = None
 
     def add_edge(self, u, v, w, undirected=False):
         self.adj[u].append((v, w))
         if undirected: self.adj[v].append((u, w))
+        self._radj = None
+        self.version += 1
 
-    def dijkstra(self, src):
+    def set_weight(self, u, v, w, undirected=False):
+        """Змінює вагу всіх ребер u→v (і v→u, якщо undirected); відсутні ребра додаються."""
+        for a, b in ((u, v), (v, u)) if undirected else ((u, v),):
+            edges = self.adj[a]
+            found = False
+            for i, (x, _) in enumerate(edges):
+                if x == b:
+                    edges[i] = (x, w)
+                    found = True
+            if not found:
+                edges.append((b, w))
+        self._radj = None
+        self.version += 1
+
+    def enable_cache(self, maxsize: int = 128, max_bytes: Optional[int] = None) -> "ShortestPathCache":
+        """Вмикає LRU-кеш дерев найкоротших шляхів для dijkstra_cached."""
+        self._sp_cache = ShortestPathCache(maxsize, max_bytes)
+        return self._sp_cache
+
+    def dijkstra_cached(self, src):
+        """
+        Як dijkstra, але (dist, parent) для src береться з LRU-кешу за O(1).
+        Будь-який add_edge збільшує version, і кеш скидається при наступному запиті.
+        Результат спільний для всіх викликів — не змінюйте його.
+        """
+        cache = self._sp_cache or self.enable_cache()
+        res = cache.get(self.version, src)
+        if res is None:
+            res = self.dijkstra(src)
+            cache.put(self.version, src, res)
+        return res
+
+    def cache_info(self) -> "CacheInfo":
+        return (self._sp_cache or self.enable_cache()).info()
+
+    def dijkstra(self, src, queue: str = "heapq", stats: Optional[Dict[str, int]] = None):
+        """
+        Дейкстра від src. queue — стратегія черги з пріоритетом:
+          'heapq'   — бінарна купа з лінивим видаленням (за замовчуванням);
+          'dial'    — кошики Діала (лише цілі невід'ємні ваги);
+          'radix'   — радикс-купа (лише цілі невід'ємні ваги);
+          'indexed' — індексована бінарна купа з decrease-key (без застарілих записів);
+          'dary'    — індексована 4-арна купа (task4.IndexedDaryHeap) з decrease-key.
+        Якщо передано словник stats, у нього записуються лічильники:
+        pushes, pops, stale_pops, decrease_keys, relaxations.
+        """
+        if queue != "heapq" or stats is not None:
+            return self._dijkstra_queue(src, queue, stats)
         INF = float("inf")
         dist = {v: INF for v in self.adj}
         parent = {v: None for v in self.adj}
@@ -31,6 +86,137 @@ class Graph:
                     heapq.heappush(pq, (nd, v))
         return dist, parent
 
+    def _dijkstra_queue(self, src, queue: str, stats: Optional[Dict[str, int]]):
+        INF = float("inf")
+        if queue in ("dial", "radix"):
+            max_w = 0
+            for edges in self.adj.values():
+                for _, w in edges:
+                    if not math.isfinite(w) or w < 0 or w != int(w):
+                        raise ValueError(f"queue='{queue}' потребує цілих невід'ємних ваг, отримано {w!r}")
+                    max_w = max(max_w, w)
+            q = BucketQueue(max_w) if queue == "dial" else RadixHeap()
+        elif queue == "heapq":
+            q = LazyHeapQueue()
+        elif queue == "indexed":
+            q = IndexedHeapQueue()
+        elif queue == "dary":
+            q = DaryHeapQueue()
+        else:
+            raise ValueError("queue має бути 'heapq', 'dial', 'radix', 'indexed' або 'dary'")
+
+        dist = {v: INF for v in self.adj}
+        parent = {v: None for v in self.adj}
+        for u in list(self.adj):
+            for v, _ in self.adj[u]:
+                if v not in dist: dist[v] = INF; parent[v] = None
+        dist[src] = 0.0
+        stale = relaxations = 0
+        push, pop = q.push, q.pop
+        push(0.0, src)
+        while q:
+            d, u = pop()
+            if d != dist[u]:
+                stale += 1
+                continue
+            for v, w in self.adj.get(u, []):
+                nd = d + w
+                if nd < dist[v]:
+                    relaxations += 1
+                    dist[v], parent[v] = nd, u
+                    push(nd, v)
+        if stats is not None:
+            stats.update(pushes=q.pushes, pops=q.pops, stale_pops=stale,
+                         decrease_keys=q.decrease_keys, relaxations=relaxations)
+        return dist, parent
+
+    def reverse_adj(self) -> Dict[Any, List[Tuple[Any, float]]]:
+        """Обернені списки суміжності (v → [(u, w)]) для пошуку назад; кешуються до add_edge."""
+        if self._radj is None:
+            radj = defaultdict(list)
+            for u, edges in self.adj.items():
+                for v, w in edges:
+                    radj[v].append((u, w))
+            self._radj = radj
+        return self._radj
+
+    def shortest_path(self, src, dst, method: str = "dijkstra", heuristic=None) -> Tuple[float, List[Any]]:
+        """
+        Найкоротший шлях для однієї пари src → dst. Повертає (відстань, шлях);
+        якщо шляху немає — (inf, []).
+          method='dijkstra'      — Дейкстра з раннім виходом, щойно dst зафіксовано;
+          method='bidirectional' — зустрічний пошук від src і від dst (по reverse_adj);
+          method='astar'         — A* з heuristic(v, dst) (допустимою, напр. euclidean_heuristic(pos)).
+        """
+        if method == "dijkstra":
+            return self._astar(src, dst, None)
+        if method == "astar":
+            if heuristic is None:
+                raise ValueError("для method='astar' потрібна heuristic")
+            return self._astar(src, dst, heuristic)
+        if method == "bidirectional":
+            return self._bidirectional(src, dst)
+        raise ValueError("method має бути 'dijkstra', 'bidirectional' або 'astar'")
+
+    def _astar(self, src, dst, heuristic) -> Tuple[float, List[Any]]:
+        """A* (з heuristic=None — звичайна Дейкстра) з виходом при фіксації dst."""
+        INF = float("inf")
+        h = heuristic or (lambda v, t: 0.0)
+        dist, parent = {src: 0.0}, {src: None}
+        pq = [(h(src, dst), 0.0, src)]
+        while pq:
+            _, d, u = heapq.heappop(pq)
+            if d != dist[u]:
+                continue
+            if u == dst:
+                return d, Graph.path(parent, src, dst)
+            for v, w in self.adj.get(u, []):
+                nd = d + w
+                if nd < dist.get(v, INF):
+                    dist[v], parent[v] = nd, u
+                    heapq.heappush(pq, (nd + h(v, dst), nd, v))
+        return INF, []
+
+    def _bidirectional(self, src, dst) -> Tuple[float, List[Any]]:
+        """Двонаправлена Дейкстра: зупинка, коли min(fwd) + min(bwd) ≥ найкращої зустрічі."""
+        INF = float("inf")
+        if src == dst:
+            return 0.0, [src]
+        adj = (self.adj, self.reverse_adj())
+        dist = ({src: 0.0}, {dst: 0.0})
+        parent = ({src: None}, {dst: None})
+        pq = ([(0.0, src)], [(0.0, dst)])
+        done = (set(), set())
+        best, meet = INF, None
+        while pq[0] and pq[1]:
+            if pq[0][0][0] + pq[1][0][0] >= best:
+                break
+            side = 0 if pq[0][0][0] <= pq[1][0][0] else 1
+            d, u = heapq.heappop(pq[side])
+            if u in done[side] or d != dist[side][u]:
+                continue
+            done[side].add(u)
+            other = dist[1 - side]
+            for v, w in adj[side].get(u, []):
+                nd = d + w
+                if nd < dist[side].get(v, INF):
+                    dist[side][v], parent[side][v] = nd, u
+                    heapq.heappush(pq[side], (nd, v))
+                if v in other and nd + other[v] < best:
+                    best, meet = nd + other[v], v
+        if meet is None:
+            return INF, []
+        head = Graph.path(parent[0], src, meet)
+        tail, cur = [], parent[1][meet]
+        while cur is not None:
+            tail.append(cur)
+            cur = parent[1][cur]
+        return best, head + tail
+
+    def freeze(self) -> "CSRGraph":
+        """Знімок графа у компактному CSR-форматі (подальші add_edge його не змінюють)."""
+        return CSRGraph.from_graph(self)
+
     @staticmethod
     def path(parent: Dict[Any, Any | None], src: Any, dst: Any) -> List[Any]:
         p, cur = [], dst
@@ -42,38 +228,1027 @@ class Graph:
         return p[::-1] if p and p[-1] == src else []
 
 
-def print_explained_distances(g: Graph, src, dist, parent) -> None:
-    def w(u, v):
-        for x, wt in g.adj.get(u, []):
-            if x == v: return wt
-        for x, wt in g.adj.get(v, []):
-            if x == u: return wt
-        return None
-
-    def path_to(dst):
-        p, cur = [], dst
-        if cur not in parent and cur != src: return []
-        while cur is not None:
-            p.append(cur)
-            if cur == src: break
-            cur = parent.get(cur)
-        return p[::-1] if p and p[-1] == src else []
+class LazyHeapQueue:
+    """heapq з лінивим видаленням: кожне покращення — новий запис, застарілі пропускаються."""
 
-    fmt = lambda x: str(int(x)) if isinstance(x, float) and x.is_integer() else str(x)
+    def __init__(self):
+        self._heap: List[Tuple[float, Any]] = []
+        self.pushes = self.pops = self.decrease_keys = 0
 
-    print(f"Найкоротші відстані від {src}")
-    print(", ".join(f"{v}:{float(dist[v]):.1f}" for v in sorted(dist, key=str)))
-    order = [src] + sorted((v for v in dist if v != src), key=lambda v: dist[v])
-    for v in order:
-        if v == src:
-            print(f"{v}: 0,")
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, d, v) -> None:
+        self.pushes += 1
+        heapq.heappush(self._heap, (d, v))
+
+    def pop(self) -> Tuple[float, Any]:
+        self.pops += 1
+        return heapq.heappop(self._heap)
+
+
+class BucketQueue:
+    """
+    Черга Діала для цілих ваг 0..max_w: циклічний масив з max_w + 1 кошиків.
+    Усі ключі в черзі лежать у [cur, cur + max_w], тож push/pop — O(1)
+    (амортизовано O(max_w) на порожні кошики між сусідніми відстанями).
+    """
+
+    def __init__(self, max_w: int):
+        self._buckets: List[List[Tuple[float, Any]]] = [[] for _ in range(int(max_w) + 1)]
+        self._cur = 0
+        self._size = 0
+        self.pushes = self.pops = self.decrease_keys = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, d, v) -> None:
+        self.pushes += 1
+        self._size += 1
+        self._buckets[int(d) % len(self._buckets)].append((d, v))
+
+    def pop(self) -> Tuple[float, Any]:
+        buckets, nb = self._buckets, len(self._buckets)
+        while not buckets[self._cur % nb]:
+            self._cur += 1
+        self.pops += 1
+        self._size -= 1
+        return buckets[self._cur % nb].pop()
+
+
+class RadixHeap:
+    """
+    Монотонна радикс-купа для цілих ключів: запис з ключем d лежить у кошику
+    bit_length(d ^ last), де last — останній вийнятий мінімум. Кожен запис
+    переміщується вниз не більше ~log(C) разів.
+    """
+
+    def __init__(self):
+        self._buckets: List[List[Tuple[float, Any]]] = [[] for _ in range(65)]
+        self._last = 0
+        self._size = 0
+        self.pushes = self.pops = self.decrease_keys = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, d, v) -> None:
+        self.pushes += 1
+        self._size += 1
+        self._buckets[(int(d) ^ self._last).bit_length()].append((d, v))
+
+    def pop(self) -> Tuple[float, Any]:
+        buckets = self._buckets
+        if not buckets[0]:
+            i = 1
+            while not buckets[i]:
+                i += 1
+            items = buckets[i]
+            buckets[i] = []
+            last = self._last = int(min(items, key=lambda it: it[0])[0])
+            for it in items:
+                buckets[(int(it[0]) ^ last).bit_length()].append(it)
+        self.pops += 1
+        self._size -= 1
+        return buckets[0].pop()
+
+
+class IndexedHeapQueue:
+    """Індексована бінарна купа зі справжнім decrease-key: кожна вершина в черзі не більше одного разу."""
+
+    def __init__(self):
+        self._heap: List[Any] = []
+        self._key: Dict[Any, float] = {}
+        self._pos: Dict[Any, int] = {}
+        self.pushes = self.pops = self.decrease_keys = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, d, v) -> None:
+        i = self._pos.get(v)
+        if i is None:
+            self.pushes += 1
+            self._heap.append(v)
+            i = self._pos[v] = len(self._heap) - 1
+        elif d < self._key[v]:
+            self.decrease_keys += 1
+        else:
+            return
+        self._key[v] = d
+        self._sift_up(i)
+
+    def pop(self) -> Tuple[float, Any]:
+        heap, pos = self._heap, self._pos
+        top = heap[0]
+        last = heap.pop()
+        del pos[top]
+        if heap:
+            heap[0] = last
+            pos[last] = 0
+            self._sift_down(0)
+        self.pops += 1
+        return self._key.pop(top), top
+
+    def _sift_up(self, i: int) -> None:
+        heap, pos, key = self._heap, self._pos, self._key
+        v = heap[i]
+        kv = key[v]
+        while i > 0:
+            p = (i - 1) >> 1
+            if key[heap[p]] <= kv:
+                break
+            heap[i] = heap[p]
+            pos[heap[i]] = i
+            i = p
+        heap[i] = v
+        pos[v] = i
+
+    def _sift_down(self, i: int) -> None:
+        heap, pos, key = self._heap, self._pos, self._key
+        n = len(heap)
+        v = heap[i]
+        kv = key[v]
+        while True:
+            c = 2 * i + 1
+            if c >= n:
+                break
+            if c + 1 < n and key[heap[c + 1]] < key[heap[c]]:
+                c += 1
+            if kv <= key[heap[c]]:
+                break
+            heap[i] = heap[c]
+            pos[heap[i]] = i
+            i = c
+        heap[i] = v
+        pos[v] = i
+
+
+class DaryHeapQueue:
+    """Адаптер task4.IndexedDaryHeap до інтерфейсу черг Дейкстри: push(d, v) — вставка або decrease-key."""
+
+    def __init__(self, d: int = 4):
+        from task4 import IndexedDaryHeap  # task4 тягне numpy і task5 — імпортуємо лише на вимогу
+
+        self._heap = IndexedDaryHeap(d)
+        self.pushes = self.pops = self.decrease_keys = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, d, v) -> None:
+        heap = self._heap
+        if v not in heap:
+            self.pushes += 1
+            heap.push(v, d)
+        elif d < heap.key(v):
+            self.decrease_keys += 1
+            heap.decrease_key(v, d)
+
+    def pop(self) -> Tuple[float, Any]:
+        v, d = self._heap.pop()
+        self.pops += 1
+        return d, v
+
+
+class DynamicSSSP:
+    """
+    Підтримує актуальні dist/parent від одного джерела при вставці ребер і
+    зменшенні ваг (у стилі Ramalingam–Reps): після зміни ребра u→v, якщо
+    dist[u] + w < dist[v], лише «покращена» частина дерева найкоротших шляхів
+    перераховується локальною Дейкстрою від v — решта графа не чіпається.
+    Збільшення ваги або зміни графа в обхід цього об'єкта → повний перерахунок.
+    """
+
+    def __init__(self, g: Graph, src):
+        self.g = g
+        self.src = src
+        self.recompute()
+
+    def recompute(self) -> None:
+        self.dist, self.parent = self.g.dijkstra(self.src)
+        self.version = self.g.version
+
+    def _check_version(self) -> None:
+        if self.version != self.g.version:
+            self.recompute()
+
+    def result(self) -> Tuple[Dict[Any, float], Dict[Any, Any | None]]:
+        self._check_version()
+        return self.dist, self.parent
+
+    def add_edge(self, u, v, w, undirected=False) -> None:
+        self._check_version()
+        self.g.add_edge(u, v, w, undirected)
+        self.version = self.g.version
+        self._repair([(u, v, w)] + ([(v, u, w)] if undirected else []))
+
+    def set_weight(self, u, v, w, undirected=False) -> None:
+        """Нова вага ребра: зменшення — локальний ремонт, збільшення — повний перерахунок."""
+        self._check_version()
+        pairs = ((u, v), (v, u)) if undirected else ((u, v),)
+        increased = any(w > x_w for a, b in pairs for x, x_w in self.g.adj.get(a, []) if x == b)
+        self.g.set_weight(u, v, w, undirected)
+        if increased:
+            self.recompute()
+            return
+        self.version = self.g.version
+        self._repair([(u, v, w)] + ([(v, u, w)] if undirected else []))
+
+    def _repair(self, changed: List[Tuple[Any, Any, float]]) -> None:
+        INF = float("inf")
+        dist, parent = self.dist, self.parent
+        pq = []
+        for u, v, w in changed:
+            dist.setdefault(u, INF); parent.setdefault(u, None)
+            dist.setdefault(v, INF); parent.setdefault(v, None)
+            nd = dist[u] + w
+            if nd < dist[v]:
+                dist[v], parent[v] = nd, u
+                heapq.heappush(pq, (nd, v))
+        while pq:
+            d, x = heapq.heappop(pq)
+            if d != dist[x]:
+                continue
+            for y, wy in self.g.adj.get(x, []):
+                nd = d + wy
+                if nd < dist.get(y, INF):
+                    dist[y], parent[y] = nd, x
+                    heapq.heappush(pq, (nd, y))
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    bytes: int
+
+
+def _result_bytes(result) -> int:
+    """
+    Пам'ять результату (dist, parent): таблиці обох словників плюс власні об'єкти-відстані
+    dist (кожен float рахується один раз). Ключі й батьки — мітки, спільні з графом, — не рахуються.
+    """
+    dist, parent = result
+    own = {id(d): d for d in dist.values()}
+    return sys.getsizeof(dist) + sys.getsizeof(parent) + sum(map(sys.getsizeof, own.values()))
+
+
+class ShortestPathCache:
+    """
+    LRU-кеш результатів Дейкстри: src → (dist, parent) для однієї версії графа.
+    maxsize — максимум джерел, max_bytes — бюджет пам'яті (оцінка _result_bytes:
+    обидва словники плюс float-відстані). Запис зі старшою версією графа скидає весь кеш.
+    """
+
+    def __init__(self, maxsize: int = 128, max_bytes: Optional[int] = None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.version: Optional[int] = None
+        self._data: "OrderedDict[Any, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    def get(self, version: int, src):
+        if version != self.version:
+            self.clear()
+            self.version = version
+        item = self._data.get(src)
+        if item is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(src)
+        self.hits += 1
+        return item[0]
+
+    def put(self, version: int, src, result) -> None:
+        if version != self.version:
+            self.clear()
+            self.version = version
+        size = _result_bytes(result)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        old = self._data.pop(src, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._data[src] = (result, size)
+        self._bytes += size
+        while self._data and (len(self._data) > self.maxsize or
+                              (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            _, (_, freed) = self._data.popitem(last=False)
+            self._bytes -= freed
+            self.evictions += 1
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.evictions, len(self._data), self._bytes)
+
+
+class _IdentityIndex:
+    """Відображення мітка → id для labels = range(n) без окремого словника."""
+
+    def __init__(self, n: int):
+        self.n = n
+
+    def __contains__(self, v) -> bool:
+        return isinstance(v, int) and 0 <= v < self.n
+
+    def __getitem__(self, v) -> int:
+        if v not in self:
+            raise KeyError(v)
+        return v
+
+    def get(self, v, default=None):
+        return v if v in self else default
+
+
+class _StrLabels:
+    """
+    Рядкові мітки з файлу CSRGraph: зсуви початків (int64) і UTF-8 блоб на mmap,
+    де кожна мітка закінчується байтом NUL. Рядок декодується лише при зверненні,
+    тож load не розбирає всі мітки; повний перебір — один decode і split.
+    """
+
+    __slots__ = ("offsets", "blob")
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1] - 1], "utf-8", "surrogatepass")
+
+    def __iter__(self):
+        data = bytes(self.blob)
+        if data.count(b"\0") == len(self):
+            parts = data.decode("utf-8", "surrogatepass").split("\0")
+            parts.pop()
+            return iter(parts)
+        # NUL трапився всередині міток — ріжемо за зсувами
+        offsets = self.offsets.tolist()
+        return (str(data[a:b - 1], "utf-8", "surrogatepass") for a, b in zip(offsets, offsets[1:]))
+
+
+class _SortedStrKeys:
+    """Рядкові мітки файлу в порядку perm як UTF-8 bytes — послідовність для bisect."""
+
+    __slots__ = ("labels", "perm")
+
+    def __init__(self, labels: _StrLabels, perm):
+        self.labels = labels
+        self.perm = perm
+
+    def __len__(self) -> int:
+        return len(self.perm)
+
+    def __getitem__(self, i: int) -> bytes:
+        j = self.perm[i]
+        offsets = self.labels.offsets
+        return bytes(self.labels.blob[offsets[j]:offsets[j + 1] - 1])
+
+
+class _SortedIndex:
+    """
+    Відображення мітка → id для міток з файлу: двійковий пошук по відсортованих
+    ключах (keys[i] — мітка вершини perm[i]) прямо на mmap, O(log n) без словника.
+    to_key переводить мітку в ключ (None — мітка не того типу).
+    """
+
+    def __init__(self, keys, perm, to_key):
+        self.keys = keys
+        self.perm = perm
+        self.to_key = to_key
+
+    def _find(self, v) -> int:
+        key = self.to_key(v)
+        if key is None:
+            return -1
+        i = bisect_left(self.keys, key)
+        if i < len(self.perm) and self.keys[i] == key:
+            return self.perm[i]
+        return -1
+
+    def __contains__(self, v) -> bool:
+        return self._find(v) >= 0
+
+    def __getitem__(self, v) -> int:
+        i = self._find(v)
+        if i < 0:
+            raise KeyError(v)
+        return i
+
+    def get(self, v, default=None):
+        i = self._find(v)
+        return i if i >= 0 else default
+
+
+def _int_key(v):
+    return v if isinstance(v, int) else None
+
+
+def _str_key(v):
+    return v.encode("utf-8", "surrogatepass") if isinstance(v, str) else None
+
+
+class CSRGraph:
+    """
+    Компактний «заморожений» граф у форматі CSR (compressed sparse row).
+    Вершини перенумеровано 0..n-1 (labels[i] ↔ index[label]); сусіди вершини i —
+    targets[offsets[i]:offsets[i+1]] з вагами weights[...] у тих самих позиціях.
+    Масиви — array.array ('q' / 'i' / 'd') або memoryview того ж формату
+    (після load з mmap): ~20 байт на ребро замість кортежу та двох об'єктів
+    Python; підтримують буферний протокол (np.frombuffer(g.targets, dtype=np.int32)
+    дає NumPy-вигляд без копії). labels може бути range(n) — тоді мітки = id.
+    """
+
+    MAGIC = b"CSRGRPH2"
+    _HEADER = struct.Struct("<8sQQQQ")  # magic, n, m, вид міток, довжина блоку міток у байтах
+    _LABELS_RANGE, _LABELS_INT, _LABELS_STR = range(3)
+
+    def __init__(self, labels, offsets, targets, weights):
+        self.labels = labels
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self._index: Optional[Dict[Any, int]] = None
+        self._mmap = None
+
+    @property
+    def index(self):
+        """
+        Мітка → id; будується ліниво (для range-міток — без словника).
+        Після load — двійковий пошук по відсортованих мітках у файлі, теж без словника.
+        """
+        if self._index is None:
+            if isinstance(self.labels, range):
+                self._index = _IdentityIndex(len(self.labels))
+            else:
+                self._index = {v: i for i, v in enumerate(self.labels)}
+        return self._index
+
+    @classmethod
+    def from_edge_arrays(cls, labels, src: array, dst: array, weights: array) -> "CSRGraph":
+        """CSR з паралельних масивів ребер (id вершин 0..n-1); стабільне групування за src через NumPy."""
+        import numpy as np
+
+        n = len(labels)
+        s = np.frombuffer(src, dtype=np.int32) if len(src) else np.empty(0, dtype=np.int32)
+        order = np.argsort(s, kind="stable")
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(s, minlength=n), out=offsets[1:])
+        t = np.frombuffer(dst, dtype=np.int32)[order] if len(dst) else np.empty(0, dtype=np.int32)
+        w = np.frombuffer(weights, dtype=np.float64)[order] if len(weights) else np.empty(0)
+        to_array = lambda code, a: array(code, a.tobytes()) if len(a) else array(code)
+        return cls(labels, to_array("q", offsets), to_array("i", t), to_array("d", w))
+
+    def _label_blobs(self):
+        """
+        (вид, блоки) міток для save; мітки мають бути всі int (int64) або всі str.
+        Разом з мітками пишеться perm — id вершин у порядку зростання міток
+        (для рядків — їх UTF-8 байтів), щоб load шукав мітку двійковим пошуком.
+        """
+        import numpy as np
+
+        labels = self.labels
+        if isinstance(labels, range) and labels == range(len(labels)):
+            return self._LABELS_RANGE, ()
+        if all(type(v) is int for v in labels):
+            try:
+                values = array("q", labels)
+            except OverflowError:
+                raise TypeError("CSRGraph.save: цілі мітки мають уміщатися в int64") from None
+            keys = np.frombuffer(values, dtype=np.int64) if len(values) else np.empty(0, dtype=np.int64)
+            perm = np.argsort(keys, kind="stable")
+            return self._LABELS_INT, (values, perm.astype(np.int64), keys[perm])
+        if all(type(v) is str for v in labels):
+            encoded = [v.encode("utf-8", "surrogatepass") for v in labels]
+            perm = array("q", sorted(range(len(encoded)), key=encoded.__getitem__))
+            offsets = array("q", [0])
+            offsets.extend(accumulate(len(b) + 1 for b in encoded))
+            return self._LABELS_STR, (offsets, perm, b"\0".join(encoded) + b"\0" if encoded else b"")
+        raise TypeError("CSRGraph.save: мітки мають бути всі int або всі str "
+                        "(інші типи не зберігаються без втрати типу)")
+
+    def save(self, path: str) -> None:
+        """
+        Бінарний формат: заголовок, offsets (int64), targets (int32, вирівняно до 8 байт),
+        weights (float64), далі мітки: нічого для range(n); для цілих — int64-мітки,
+        perm і відсортовані мітки; для рядкових — зсуви int64, perm і UTF-8 блоб
+        (кожна мітка з NUL у кінці). Інші типи міток — TypeError (до запису файлу).
+        Читається load(path) з mmap без розбору тексту.
+        """
+        kind, label_blobs = self._label_blobs()
+        labels_len = sum(memoryview(b).nbytes for b in label_blobs)
+        with open(path, "wb") as f:
+            f.write(self._HEADER.pack(self.MAGIC, self.n, self.m, kind, labels_len))
+            for arr in (self.offsets, self.targets, self.weights):
+                mv = memoryview(arr).cast("B")
+                f.write(mv)
+                f.write(b"\0" * (-mv.nbytes % 8))
+            for blob in label_blobs:
+                f.write(blob)
+
+    @classmethod
+    def load(cls, path: str, use_mmap: bool = True) -> "CSRGraph":
+        """
+        Зчитує файл save(); з use_mmap=True масиви — memoryview на mmap (без копіювання).
+        Мітки теж не розбираються: int — memoryview, str — декодуються при зверненні,
+        а index шукає мітку двійковим пошуком по perm з файлу — граф готовий
+        до dijkstra(label) без O(n) побудови словника.
+        """
+        import mmap
+
+        with open(path, "rb") as f:
+            if use_mmap:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                buf = f.read()
+        mv = memoryview(buf)
+        magic, n, m, kind, labels_len = cls._HEADER.unpack_from(mv, 0)
+        if magic != cls.MAGIC:
+            raise ValueError(f"{path}: не CSR-граф (невідомий заголовок)")
+        pos = cls._HEADER.size
+        parts = []
+        for code, count in (("q", n + 1), ("i", m), ("d", m)):
+            size = array(code).itemsize * count
+            parts.append(mv[pos:pos + size].cast(code))
+            pos += size + (-size % 8)
+        index = None
+        if kind == cls._LABELS_RANGE:
+            labels = range(n)
+        elif kind == cls._LABELS_INT:
+            labels, perm, keys = (mv[pos + 8 * n * k:pos + 8 * n * (k + 1)].cast("q") for k in range(3))
+            index = _SortedIndex(keys, perm, _int_key)
+        elif kind == cls._LABELS_STR:
+            perm_at = pos + 8 * (n + 1)
+            blob_at = perm_at + 8 * n
+            labels = _StrLabels(mv[pos:perm_at].cast("q"), mv[blob_at:pos + labels_len])
+            perm = mv[perm_at:blob_at].cast("q")
+            index = _SortedIndex(_SortedStrKeys(labels, perm), perm, _str_key)
+        else:
+            raise ValueError(f"{path}: невідомий вид міток {kind}")
+        g = cls(labels, *parts)
+        g._index = index
+        g._mmap = buf if use_mmap else None
+        return g
+
+    @classmethod
+    def from_graph(cls, g: "Graph") -> "CSRGraph":
+        labels = list(g.adj)
+        index = {v: i for i, v in enumerate(labels)}
+        for u in g.adj:
+            for v, _ in g.adj[u]:
+                if v not in index:
+                    index[v] = len(labels)
+                    labels.append(v)
+        offsets, targets, weights = array("q", [0]), array("i"), array("d")
+        for u in labels:
+            for v, w in g.adj.get(u, ()):
+                targets.append(index[v])
+                weights.append(w)
+            offsets.append(len(targets))
+        g = cls(labels, offsets, targets, weights)
+        g._index = index
+        return g
+
+    @property
+    def n(self) -> int:
+        return len(self.labels)
+
+    @property
+    def m(self) -> int:
+        return len(self.targets)
+
+    def dijkstra(self, src) -> Tuple[array, array]:
+        """
+        Дейкстра над масивами CSR. Повертає компактні масиви, індексовані id вершин:
+        dist ('d', inf — недосяжна) і parent ('q', -1 — немає батька).
+        """
+        dist = array("d", [float("inf")]) * self.n
+        parent = array("q", [-1]) * self.n
+        _csr_dijkstra(self.offsets, self.targets, self.weights, self.index[src], dist, parent)
+        return dist, parent
+
+    def dijkstra_many(self, sources, workers: Optional[int] = None, with_parent: bool = False):
+        """
+        Дейкстра з багатьох джерел паралельно (ProcessPoolExecutor).
+        Масиви CSR один раз копіюються у shared memory, і воркери читають їх
+        без пікелінгу графа; рядки результату пишуться прямо у спільну матрицю.
+        Повертає NumPy-матрицю dist форми (len(sources), n) — стовпці в порядку
+        self.labels — або (dist, parent), якщо with_parent=True (parent: id, -1 — немає).
+        workers=1 — без пулу, у поточному процесі.
+        """
+        import numpy as np
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import shared_memory
+
+        ids = [self.index[s] for s in sources]
+        k, n = len(ids), self.n
+        if workers == 1 or k <= 1:
+            dist = np.full((k, n), np.inf)
+            parent = np.full((k, n), -1, dtype=np.int64)
+            for row, s in enumerate(ids):
+                d, p = self.dijkstra(self.labels[s])
+                dist[row], parent[row] = d, p
+            return (dist, parent) if with_parent else dist
+
+        results = {"dist": (np.float64, "d", np.inf)}
+        if with_parent:
+            results["parent"] = (np.int64, "q", -1)
+        shms, mats, layout = {}, {}, {}
+        try:
+            for name, arr in (("offsets", self.offsets), ("targets", self.targets), ("weights", self.weights)):
+                mv = memoryview(arr)
+                shm = shared_memory.SharedMemory(create=True, size=max(mv.nbytes, 1))
+                shm.buf[:mv.nbytes] = mv.cast("B")
+                shms[name] = shm
+                layout[name] = (shm.name, mv.format, len(mv))
+                mv.release()
+            # матриці результату створюються прямо в shared memory: без проміжного array і копії в блок
+            for name, (dtype, code, fill) in results.items():
+                shm = shared_memory.SharedMemory(create=True, size=max(k * n * 8, 1))
+                shms[name] = shm
+                mats[name] = np.ndarray((k, n), dtype=dtype, buffer=shm.buf)
+                mats[name].fill(fill)
+                layout[name] = (shm.name, code, k * n)
+            chunk = max(1, k // ((workers or os.cpu_count() or 1) * 4))
+            pairs = list(enumerate(ids))
+            tasks = [pairs[i:i + chunk] for i in range(0, k, chunk)]
+            with ProcessPoolExecutor(max_workers=workers, initializer=_shared_csr_init,
+                                     initargs=(layout, n)) as ex:
+                for _ in ex.map(_shared_csr_run, tasks):
+                    pass
+            dist = mats["dist"].copy()
+            parent = mats["parent"].copy() if with_parent else None
+        finally:
+            mats.clear()  # NumPy-вигляди тримають буфер — інакше close() не звільнить блок
+            for shm in shms.values():
+                shm.close()
+                shm.unlink()
+        return (dist, parent) if with_parent else dist
+
+    def to_dicts(self, dist: array, parent: array) -> Tuple[Dict[Any, float], Dict[Any, Any | None]]:
+        """Переводить масиви dist/parent у словники з мітками (як у Graph.dijkstra)."""
+        labels = self.labels
+        return (
+            {labels[i]: d for i, d in enumerate(dist)},
+            {labels[i]: (labels[p] if p >= 0 else None) for i, p in enumerate(parent)},
+        )
+
+    def path(self, parent: array, src: Any, dst: Any) -> List[Any]:
+        """Відновлює маршрут src → dst (у мітках) з масиву parent."""
+        s, cur = self.index[src], self.index.get(dst)
+        if cur is None:
+            return []
+        p = []
+        while cur >= 0:
+            p.append(self.labels[cur])
+            if cur == s:
+                return p[::-1]
+            cur = parent[cur]
+        return []
+
+
+def _csr_dijkstra(offsets, targets, weights, s: int, dist, parent) -> None:
+    """Ядро Дейкстри над CSR; dist/parent (inf / -1) заповнюються на місці."""
+    dist[s] = 0.0
+    pq = [(0.0, s)]
+    pop, push = heapq.heappop, heapq.heappush
+    while pq:
+        d, u = pop(pq)
+        if d != dist[u]:
             continue
-        p = path_to(v)
-        if not p:
-            print(f"{v}: ∞ (шлях відсутній)")
+        lo, hi = offsets[u], offsets[u + 1]
+        for v, w in zip(targets[lo:hi], weights[lo:hi]):
+            nd = d + w
+            if nd < dist[v]:
+                dist[v] = nd
+                parent[v] = u
+                push(pq, (nd, v))
+
+
+_SHARED: Dict[str, Any] = {}
+
+
+def _shared_csr_init(layout: Dict[str, Tuple[str, str, int]], n: int) -> None:
+    """Ініціалізатор воркера: під'єднується до спільних блоків CSR і матриць результату."""
+    from multiprocessing import shared_memory
+    _SHARED["n"] = n
+    for name, (shm_name, typecode, length) in layout.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _SHARED[name + "_shm"] = shm
+        _SHARED[name] = shm.buf[:array(typecode).itemsize * length].cast(typecode)
+
+
+def _shared_csr_run(task: List[Tuple[int, int]]) -> None:
+    n = _SHARED["n"]
+    dist, parent = _SHARED["dist"], _SHARED.get("parent")
+    for row, s in task:
+        p = parent[row * n:(row + 1) * n] if parent is not None else array("q", [-1]) * n
+        _csr_dijkstra(_SHARED["offsets"], _SHARED["targets"], _SHARED["weights"],
+                      s, dist[row * n:(row + 1) * n], p)
+
+
+def _iter_edge_rows(path: str, delimiter: Optional[str], header: bool, chunk_size: int):
+    """Читає файл ребер шматками по chunk_size рядків (порожні рядки та '#'-коментарі пропускаються)."""
+    import csv
+
+    if delimiter is None:
+        delimiter = "\t" if path.lower().endswith((".tsv", ".tab")) else ","
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = csv.reader(f, delimiter=delimiter)
+        if header:
+            next(rows, None)
+        while True:
+            raw = list(islice(rows, chunk_size))
+            if not raw:
+                return
+            # шматок лише з коментарів чи порожніх рядків — ще не кінець файлу
+            chunk = [r for r in raw if r and not r[0].startswith("#")]
+            if chunk:
+                yield chunk
+
+
+def load_edge_list(path: str, undirected: bool = False, delimiter: Optional[str] = None,
+                   header: bool = False, into: str = "graph", label_type=str,
+                   default_weight: float = 1.0, chunk_size: int = 100_000):
+    """
+    Потокове завантаження списку ребер CSV/TSV (u, v[, w]) шматками по chunk_size рядків.
+      into='graph' — у новий Graph (списки суміжності заповнюються напряму, без add_edge на ребро);
+      into='csr'   — одразу в компактні масиви і CSRGraph, без проміжного Graph.
+    Роздільник за замовчуванням — за розширенням (.tsv/.tab → таб, інакше кома).
+    """
+    if into == "graph":
+        g = Graph()
+        adj = g.adj
+        for chunk in _iter_edge_rows(path, delimiter, header, chunk_size):
+            for row in chunk:
+                u, v = label_type(row[0]), label_type(row[1])
+                w = float(row[2]) if len(row) > 2 and row[2] != "" else default_weight
+                adj[u].append((v, w))
+                if undirected: adj[v].append((u, w))
+            g._radj = None
+            g.version += 1
+        return g
+    if into != "csr":
+        raise ValueError("into має бути 'graph' або 'csr'")
+
+    index: Dict[Any, int] = {}
+    labels: List[Any] = []
+    src, dst, wts = array("i"), array("i"), array("d")
+    for chunk in _iter_edge_rows(path, delimiter, header, chunk_size):
+        for row in chunk:
+            ids = []
+            for lab in (label_type(row[0]), label_type(row[1])):
+                i = index.get(lab)
+                if i is None:
+                    i = index[lab] = len(labels)
+                    labels.append(lab)
+                ids.append(i)
+            w = float(row[2]) if len(row) > 2 and row[2] != "" else default_weight
+            src.append(ids[0]); dst.append(ids[1]); wts.append(w)
+            if undirected:
+                src.append(ids[1]); dst.append(ids[0]); wts.append(w)
+    g = CSRGraph.from_edge_arrays(labels, src, dst, wts)
+    g._index = index
+    return g
+
+
+def euclidean_heuristic(pos: Dict[Any, Tuple[float, float]], scale: float = 1.0):
+    """
+    Евристика для A*: scale · евклідова відстань між координатами pos (як у visualize).
+    Допустима, лише якщо вага кожного ребра ≥ scale · довжини відрізка між його вершинами.
+    """
+    def h(v, t):
+        (x1, y1), (x2, y2) = pos[v], pos[t]
+        return scale * ((x1 - x2) ** 2 + (y1 - y2) ** 2) ** 0.5
+    return h
+
+
+def benchmark_queues(n: int = 100_000, m: int = 500_000, max_w: int = 10, seed: int = 0,
+                     queues=("heapq", "indexed", "dary", "dial", "radix")) -> None:
+    """Порівняння стратегій черги на випадковому орієнтованому графі з цілими вагами 1..max_w."""
+    import random
+    import time
+
+    rnd = random.Random(seed)
+    g = Graph()
+    for _ in range(m):
+        g.add_edge(rnd.randrange(n), rnd.randrange(n), rnd.randint(1, max_w))
+    src = next(iter(g.adj))
+    print(f"V={n:,}, E={m:,}, ваги 1..{max_w}")
+    print(f"{'черга':>8} | {'час, с':>7} | {'pushes':>9} | {'pops':>9} | {'stale':>8} | {'dec-key':>8}")
+    reference = None
+    for name in queues:
+        st: Dict[str, int] = {}
+        t0 = time.perf_counter()
+        dist, _ = g.dijkstra(src, queue=name, stats=st)
+        dt = time.perf_counter() - t0
+        if reference is None:
+            reference = dist
+        elif dist != reference:
+            raise AssertionError(f"queue={name} дав інші відстані")
+        print(f"{name:>8} | {dt:7.2f} | {st['pushes']:9,} | {st['pops']:9,} | "
+              f"{st['stale_pops']:8,} | {st['decrease_keys']:8,}")
+
+
+def _edge_weight_index(g: Graph) -> Dict[Tuple[Any, Any], float]:
+    """(u, v) → мінімальна вага ребра u→v; будується один раз за O(E)."""
+    idx: Dict[Tuple[Any, Any], float] = {}
+    for u, edges in g.adj.items():
+        for v, w in edges:
+            k = (u, v)
+            if k not in idx or w < idx[k]:
+                idx[k] = w
+    return idx
+
+
+def iter_explained_paths(g: Graph, src, dist, parent, order: str = "dist"):
+    """
+    Для кожної вершини видає (v, dist[v], шлях, ваги ребер шляху); для недосяжної — (v, inf, [], []).
+    Ваги беруться з індексу ребер (O(1) на ребро), шлях — з parent без повторних пошуків.
+      order='dist' — src, далі за зростанням відстані (як у print_explained_distances);
+      order='tree' — обхід дерева найкоротших шляхів у глибину: шлях кожної вершини —
+                     це шлях батька + одне ребро, пам'ять O(V), рядки йдуть потоком.
+    """
+    INF = float("inf")
+    wt = _edge_weight_index(g)
+
+    def weight(a, b):
+        w = wt.get((a, b))
+        return w if w is not None else wt.get((b, a))
+
+    if order == "tree":
+        children: Dict[Any, List[Any]] = defaultdict(list)
+        for v, p in parent.items():
+            if p is not None and v != src:
+                children[p].append(v)
+        seen = {src}
+        yield src, 0.0, [src], []
+        path, terms = [src], []
+        stack = [iter(children.get(src, ()))]
+        while stack:
+            v = next(stack[-1], None)
+            if v is None:
+                stack.pop()
+                path.pop()
+                if terms: terms.pop()
+                continue
+            seen.add(v)
+            terms.append(weight(path[-1], v))
+            path.append(v)
+            yield v, dist[v], list(path), list(terms)
+            stack.append(iter(children.get(v, ())))
+        for v in dist:
+            if v not in seen:
+                yield v, INF, [], []
+        return
+    if order != "dist":
+        raise ValueError("order має бути 'dist' або 'tree'")
+
+    reachable = {src: True}
+    for v in [src] + sorted((v for v in dist if v != src), key=lambda v: dist[v]):
+        # піднімаємося до першої вершини з відомою досяжністю, потім позначаємо весь ланцюг
+        chain, cur = [], v
+        while cur is not None and cur not in reachable:
+            chain.append(cur)
+            cur = parent.get(cur)
+        ok = cur is not None and reachable[cur]
+        for x in chain:
+            reachable[x] = ok
+        if not ok:
+            yield v, INF, [], []
             continue
-        terms = [fmt(w(p[i], p[i+1])) for i in range(len(p)-1)]
-        print(f"{v}: {fmt(dist[v])} (шлях {'→'.join(p)} = {'+'.join(terms)}),")
+        path, cur = [v], v
+        while cur != src:
+            cur = parent[cur]
+            path.append(cur)
+        path.reverse()
+        yield v, dist[v], path, [weight(path[i], path[i + 1]) for i in range(len(path) - 1)]
+
+
+def _fmt_num(x) -> str:
+    return str(int(x)) if isinstance(x, float) and x.is_integer() else str(x)
+
+
+def iter_explained_distances(g: Graph, src, dist, parent, order: str = "dist"):
+    """Рядки звіту print_explained_distances — по одному, без накопичення."""
+    yield f"Найкоротші відстані від {src}"
+    yield ", ".join(f"{v}:{float(dist[v]):.1f}" for v in sorted(dist, key=str))
+    for v, d, p, terms in iter_explained_paths(g, src, dist, parent, order):
+        if v == src:
+            yield f"{v}: 0,"
+        elif not p:
+            yield f"{v}: ∞ (шлях відсутній)"
+        else:
+            yield (f"{v}: {_fmt_num(d)} (шлях {'→'.join(map(str, p))} = "
+                   f"{'+'.join(map(_fmt_num, terms))}),")
+
+
+def write_explained_distances(g: Graph, src, dist, parent, out=None,
+                              fmt: str = "text", order: str = "tree") -> None:
+    """
+    Потоковий запис звіту у будь-який файлоподібний out (за замовчуванням stdout):
+      fmt='text' — як print_explained_distances;
+      fmt='csv'  — node,distance,path,weights (шлях через '→', ваги через '+');
+      fmt='json' — JSON-масив об'єктів {node, distance, path, weights}, пишеться поелементно
+                   (distance = null для недосяжних).
+    """
+    out = out if out is not None else sys.stdout
+    if fmt == "text":
+        for line in iter_explained_distances(g, src, dist, parent, order):
+            out.write(line + "\n")
+    elif fmt == "csv":
+        import csv
+        wr = csv.writer(out)
+        wr.writerow(["node", "distance", "path", "weights"])
+        for v, d, p, terms in iter_explained_paths(g, src, dist, parent, order):
+            wr.writerow([v, _fmt_num(d) if p else "", "→".join(map(str, p)), "+".join(map(_fmt_num, terms))])
+    elif fmt == "json":
+        import json
+        out.write("[")
+        sep = "\n"
+        for v, d, p, terms in iter_explained_paths(g, src, dist, parent, order):
+            rec = {"node": v, "distance": d if p else None, "path": p, "weights": terms}
+            out.write(sep + json.dumps(rec, ensure_ascii=False, default=str))
+            sep = ",\n"
+        out.write("\n]\n")
+    else:
+        raise ValueError("fmt має бути 'text', 'csv' або 'json'")
+
+
+def print_explained_distances(g: Graph, src, dist, parent) -> None:
+    for line in iter_explained_distances(g, src, dist, parent):
+        print(line)
+
+
+DEMO_POS = {"A": (2.4, -0.2), "B": (4.3, 2.1), "C": (0.2, 2.2),
+            "D": (-1.8, -0.8), "E": (0.1, -3.0), "Z": (2.2, -3.0)}
+
+
+def radial_tree_layout(nodes: List[Any], parent: Dict[Any, Any | None], src: Any) -> Dict[Any, Tuple[float, float]]:
+    """
+    Радіальне розміщення за деревом найкоротших шляхів за O(V), без рекурсії:
+    радіус — глибина вершини в дереві, кутовий сектор — пропорційно кількості
+    листків піддерева. Недосяжні вершини — на зовнішньому колі.
+    """
+    import math
+
+    children: Dict[Any, List[Any]] = defaultdict(list)
+    for v, p in parent.items():
+        if p is not None and v != src:
+            children[p].append(v)
+    order, depth = [src], {src: 0}
+    for u in order:  # BFS: order росте під час обходу
+        for c in children.get(u, ()):
+            if c not in depth:
+                depth[c] = depth[u] + 1
+                order.append(c)
+    leaves = {}
+    for u in reversed(order):
+        leaves[u] = sum(leaves[c] for c in children.get(u, ()) if c in leaves) or 1
+    pos = {src: (0.0, 0.0)}
+    span = {src: (0.0, 2 * math.pi)}
+    for u in order:
+        lo, hi = span[u]
+        kids = [c for c in children.get(u, ()) if depth.get(c) == depth[u] + 1]
+        total = sum(leaves[c] for c in kids) or 1
+        for c in kids:
+            step = (hi - lo) * leaves[c] / total
+            span[c] = (lo, lo + step)
+            a = lo + step / 2
+            pos[c] = (depth[c] * math.cos(a), depth[c] * math.sin(a))
+            lo += step
+    rest = [v for v in nodes if v not in pos]
+    r = (max(depth.values()) if depth else 0) + 1.5
+    for i, v in enumerate(rest):
+        a = 2 * math.pi * i / len(rest)
+        pos[v] = (r * math.cos(a), r * math.sin(a))
+    return pos
+
+
+def auto_layout(g: Graph, nodes: List[Any], parent, src, spring_limit: int = 500) -> Dict[Any, Tuple[float, float]]:
+    """Розміщення для довільного графа: spring_layout (networkx) для малих, радіальне дерево — для великих."""
+    if len(nodes) <= spring_limit:
+        import networkx as nx
+        G = nx.Graph()
+        G.add_nodes_from(nodes)
+        G.add_edges_from((u, v) for u in g.adj for v, _ in g.adj[u])
+        return {v: tuple(p) for v, p in nx.spring_layout(G, seed=0).items()}
+    return radial_tree_layout(nodes, parent, src)
 
 
 def visualize(
@@ -85,56 +1260,101 @@ def visualize(
     pos: Optional[Dict[Any, Tuple[float, float]]] = None,
     figsize=(6.5, 6),
     save: Optional[str] = None,
+    show: bool = True,
+    label_limit: int = 200,
 ):
+    """
+    Малює граф, дерево найкоротших шляхів і маршрут src → dst.
+    Усі ребра, ребра дерева та ребра маршруту — три LineCollection, вершини — один scatter,
+    тож масштабується до сотень тисяч ребер. pos=None — авто-розміщення (auto_layout).
+    Підписи: якщо вершин більше label_limit — лише src/dst, маршрут і ~label_limit/10 вершин
+    з найбільшим степенем; при наближенні (zoom) підписуються видимі вершини, якщо їх ≤ label_limit.
+    Ваги ребер підписуються лише для ≤ label_limit ребер.
+    show=False — без вікна (разом із save — безголовий експорт PNG/SVG).
+    """
+    import numpy as np
+    from matplotlib.collections import LineCollection
+
     nodes = set(g.adj.keys())
     for u in g.adj:
         for v, _ in g.adj[u]: nodes.add(v)
     nodes = sorted(nodes, key=str)
 
     if pos is None:
-        pos = {"A": (2.4, -0.2), "B": (4.3, 2.1), "C": (0.2, 2.2),
-               "D": (-1.8, -0.8), "E": (0.1, -3.0), "Z": (2.2, -3.0)}
+        pos = auto_layout(g, nodes, parent, src)
 
-    ek = lambda a, b: tuple(sorted((a, b), key=str))
-    edges, wts = set(), {}
+    ek = lambda a, b: (a, b) if str(a) <= str(b) else (b, a)
+    wts, degree = {}, defaultdict(int)
     for u in g.adj:
         for v, w in g.adj[u]:
-            k = ek(u, v); edges.add(k); wts[k] = min(w, wts.get(k, w))
+            k = ek(u, v); wts[k] = min(w, wts.get(k, w))
+    for u, v in wts:
+        degree[u] += 1; degree[v] += 1
 
     tree = {ek(u, v) for v, u in parent.items() if u is not None and v != src}
 
-    path_edges = set()
+    path_nodes, path_edges = [], set()
     if dst is not None:
-        p = Graph.path(parent, src, dst)
-        for i in range(len(p)-1): path_edges.add(ek(p[i], p[i+1]))
+        path_nodes = Graph.path(parent, src, dst)
+        for i in range(len(path_nodes)-1): path_edges.add(ek(path_nodes[i], path_nodes[i+1]))
 
-    plt.figure(figsize=figsize); ax = plt.gca(); ax.axis('off'); ax.set_aspect('equal')
+    seg = lambda es: np.array([(pos[u], pos[v]) for u, v in es], dtype=float).reshape(-1, 2, 2)
+    big = len(nodes) > label_limit
 
-    for (u, v) in edges:
-        x1, y1 = pos[u]; x2, y2 = pos[v]
-        plt.plot([x1, x2], [y1, y2], linewidth=2.2, alpha=.35, zorder=0)
-        mx, my = (x1+x2)/2, (y1+y2)/2; w = wts[(u, v)]
-        ax.text(mx, my, str(int(w) if float(w).is_integer() else w),
-                fontsize=9, ha='center', va='center',
-                bbox=dict(boxstyle="round,pad=0.2", fc="white", ec="none", alpha=.85), zorder=1)
+    fig = plt.figure(figsize=figsize); ax = fig.gca(); ax.axis('off'); ax.set_aspect('equal')
+    ax.add_collection(LineCollection(seg(wts), linewidths=0.6 if big else 2.2, colors="C0", alpha=.35, zorder=0))
+    ax.add_collection(LineCollection(seg(tree), linewidths=1.2 if big else 3.8, colors="C1", zorder=2))
+    ax.add_collection(LineCollection(seg(path_edges), linewidths=2.5 if big else 6.0, colors="C3", zorder=3))
+    xy = np.array([pos[v] for v in nodes], dtype=float).reshape(-1, 2)
+    ax.scatter(xy[:, 0], xy[:, 1], s=6 if big else 360, color="C0", zorder=4)
+    ax.autoscale_view()
 
-    for (u, v) in tree:
-        x1, y1 = pos[u]; x2, y2 = pos[v]
-        plt.plot([x1, x2], [y1, y2], linewidth=3.8, zorder=2)
+    if len(wts) <= label_limit:
+        for (u, v), w in wts.items():
+            (x1, y1), (x2, y2) = pos[u], pos[v]
+            ax.text((x1+x2)/2, (y1+y2)/2, str(int(w) if float(w).is_integer() else w),
+                    fontsize=9, ha='center', va='center',
+                    bbox=dict(boxstyle="round,pad=0.2", fc="white", ec="none", alpha=.85), zorder=1)
 
-    for (u, v) in path_edges:
-        x1, y1 = pos[u]; x2, y2 = pos[v]
-        plt.plot([x1, x2], [y1, y2], linewidth=6.0, zorder=3)
-
-    for v in nodes:
-        x, y = pos[v]; ax.scatter([x], [y], s=360, zorder=4)
+    def node_label(v):
         d = 0 if v == src else dist.get(v, float('inf'))
         lab = "∞" if d == float('inf') else (str(int(d)) if float(d).is_integer() else f"{d:.1f}")
-        ax.text(x, y, f"{v}\n{lab}", fontsize=10, ha='center', va='center',
-                bbox=dict(boxstyle="round,pad=0.35", fc="white", ec="black", alpha=.95), zorder=5)
+        return f"{v}\n{lab}"
+
+    labels = []
+
+    def draw_labels(vs):
+        for t in labels: t.remove()
+        labels.clear()
+        for v in vs:
+            x, y = pos[v]
+            labels.append(ax.text(x, y, node_label(v), fontsize=10 if not big else 7, ha='center', va='center',
+                                  bbox=dict(boxstyle="round,pad=0.35", fc="white", ec="black", alpha=.95),
+                                  zorder=5))
+
+    if not big:
+        draw_labels(nodes)
+    else:
+        important = {src, *path_nodes}
+        top = sorted(nodes, key=lambda v: -degree[v])[:max(label_limit // 10 - len(important), 0)]
+        base = list(important) + [v for v in top if v not in important]
+        draw_labels(base)
+
+        def on_zoom(_ax):
+            (x0, x1), (y0, y1) = ax.get_xlim(), ax.get_ylim()
+            inside = (xy[:, 0] >= min(x0, x1)) & (xy[:, 0] <= max(x0, x1)) & \
+                     (xy[:, 1] >= min(y0, y1)) & (xy[:, 1] <= max(y0, y1))
+            vis = np.flatnonzero(inside)
+            draw_labels([nodes[i] for i in vis] if len(vis) <= label_limit else base)
+
+        ax.callbacks.connect('xlim_changed', on_zoom)
+        ax.callbacks.connect('ylim_changed', on_zoom)
 
     ax.set_title(f"Дейкстра від {src}" + (f" (шлях {src}→{dst})" if dst else ""))
-    if save: plt.savefig(save, dpi=180, bbox_inches='tight')
+    if save: fig.savefig(save, dpi=180, bbox_inches='tight')
+    if not show:
+        plt.close(fig)
+        return
     try:
         plt.show()
     except KeyboardInterrupt:
@@ -160,6 +1380,8 @@ if __name__ == "__main__":
     print_explained_distances(g, src, dist, parent)
     p = Graph.path(parent, src, "Z")
     print("Шлях A→Z:", " -> ".join(p) if p else "немає шляху")
+    d_az, p_az = g.shortest_path("A", "Z", method="bidirectional")
+    print(f"Двонаправлений пошук A→Z: {d_az:g} ({' -> '.join(p_az)})")
 
-    visualize(g, parent, dist, src=src, dst="Z")
+    visualize(g, parent, dist, src=src, dst="Z", pos=DEMO_POS)
 
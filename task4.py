@@ -1,46 +1,36 @@
 import uuid
 import heapq
 import math
+from array import array
 
-import networkx as nx
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.artist import Artist
+
+from task5 import (animation_writer, draw_marker_groups, draw_tree_arrays, tree_arrays,
+                   tree_edge_polyline)
 
 
 class Node:
     def __init__(self, key, color="skyblue"):
         self.left = None
         self.right = None
+        self.children = None  # для d-арних дерев (d > 2): діти по слотах 0..d-1
         self.val = key
         self.color = color
         self.id = str(uuid.uuid4())
 
 
-def add_edges(graph, node, pos, x=0, y=0, layer=1):
-    if node is not None:
-        graph.add_node(node.id, color=node.color, label=node.val)
-        if node.left:
-            graph.add_edge(node.id, node.left.id)
-            l = x - 1 / 2 ** layer
-            pos[node.left.id] = (l, y - 1)
-            l = add_edges(graph, node.left, pos, x=l, y=y - 1, layer=layer + 1)
-        if node.right:
-            graph.add_edge(node.id, node.right.id)
-            r = x + 1 / 2 ** layer
-            pos[node.right.id] = (r, y - 1)
-            r = add_edges(graph, node.right, pos, x=r, y=y - 1, layer=layer + 1)
-    return graph
-
-
 def draw_tree(tree_root, show=True):
-    tree = nx.DiGraph()
-    pos = {tree_root.id: (0, 0)}
-    tree = add_edges(tree, tree_root, pos)
-
-    colors = [node[1]['color'] for node in tree.nodes(data=True)]
-    labels = {node[0]: node[1]['label'] for node in tree.nodes(data=True)}
-
-    plt.figure(figsize=(8, 5))
-    nx.draw(tree, pos=pos, labels=labels, arrows=False, node_size=2500, node_color=colors)
+    """
+    Малює дерево з Node (бінарне або d-арне з build_heap_tree(..., d)):
+    координати — охайне розміщення task5.tree_arrays (ітеративне, кешоване за формою),
+    ребра й вузли — task5.draw_tree_arrays.
+    """
+    nodes, x, y, parent = tree_arrays(tree_root)
+    fig = plt.figure(figsize=(8, 5))
+    draw_tree_arrays(fig.add_axes((0, 0, 1, 1)), x, y, parent,
+                     [node.color for node in nodes], [node.val for node in nodes])
 
     if show:
         try:
@@ -50,10 +40,11 @@ def draw_tree(tree_root, show=True):
             print("\n[Перервано користувачем]")
 
 
-def build_heap_tree(arr, color_rule=None):
+def build_heap_tree(arr, color_rule=None, d=2):
     """
     arr: список значень (min-heap або max-heap у масивному представленні).
     color_rule: функція idx,val -> color (необов'язково).
+    d: арність купи; для d > 2 діти вузла i (d·i+1 … d·i+d) пишуться в node.children.
     """
     if not arr:
         return None
@@ -67,6 +58,10 @@ def build_heap_tree(arr, color_rule=None):
             nodes[i].color = color_rule(i, val)
 
     n = len(arr)
+    if d != 2:
+        for i in range(n):
+            nodes[i].children = nodes[d * i + 1:min(d * i + d + 1, n)]
+        return nodes[0]
     for i in range(n):
         li, ri = 2 * i + 1, 2 * i + 2
         if li < n:
@@ -76,26 +71,507 @@ def build_heap_tree(arr, color_rule=None):
     return nodes[0]
 
 
-def visualize_heap(arr, color_rule=None):
+class IndexedDaryHeap:
     """
-    Побудувати дерево з купи arr і намалювати його тим самим draw_tree().
-    color_rule: опційно, функція idx,val -> 'skyblue'/'tomato'/... для підсвітки.
+    Індексована d-арна min-купа: паралельні масиви items/keys і карта позицій
+    item → індекс, тож push, pop, decrease_key і remove працюють за O(log_d n),
+    а contains — за O(1). Діти вузла i — d·i+1 … d·i+d, батько — (i-1)//d.
+    Ширша купа (d=4) неглибока: менше кроків просіювання вгору, що вигідно
+    для навантажень з частими decrease_key (Дейкстра).
     """
-    root = build_heap_tree(arr, color_rule=color_rule)
-    if root is None:
+
+    def __init__(self, d: int = 4):
+        if d < 2:
+            raise ValueError("арність купи d має бути не менше 2")
+        self.d = d
+        self.items: list = []
+        self.keys: list = []
+        self._pos: dict = {}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, item) -> bool:
+        return item in self._pos
+
+    def contains(self, item) -> bool:
+        return item in self._pos
+
+    def key(self, item):
+        """Поточний пріоритет item (KeyError, якщо його немає в купі)."""
+        return self.keys[self._pos[item]]
+
+    def peek(self):
+        """Пара (item, key) з найменшим ключем без видалення."""
+        if not self.items:
+            raise IndexError("peek з порожньої купи")
+        return self.items[0], self.keys[0]
+
+    def push(self, item, key) -> None:
+        if item in self._pos:
+            raise KeyError(f"{item!r} вже в купі; використайте decrease_key")
+        self.items.append(item)
+        self.keys.append(key)
+        self._pos[item] = len(self.items) - 1
+        self._sift_up(len(self.items) - 1)
+
+    def pop(self):
+        """Видаляє й повертає пару (item, key) з найменшим ключем."""
+        if not self.items:
+            raise IndexError("pop з порожньої купи")
+        return self._take(0)
+
+    def decrease_key(self, item, key) -> None:
+        i = self._pos[item]
+        if key > self.keys[i]:
+            raise ValueError(f"новий ключ {key!r} більший за поточний {self.keys[i]!r}")
+        self.keys[i] = key
+        self._sift_up(i)
+
+    def remove(self, item):
+        """Видаляє довільний item; повертає його ключ."""
+        return self._take(self._pos[item])[1]
+
+    def _take(self, i: int):
+        items, keys, pos = self.items, self.keys, self._pos
+        item, key = items[i], keys[i]
+        del pos[item]
+        last_item, last_key = items.pop(), keys.pop()
+        if i < len(items):
+            items[i], keys[i] = last_item, last_key
+            pos[last_item] = i
+            if i > 0 and last_key < keys[(i - 1) // self.d]:
+                self._sift_up(i)
+            else:
+                self._sift_down(i)
+        return item, key
+
+    def _sift_up(self, i: int) -> None:
+        # «дірка» замість обмінів: кожен крок — одне присвоєння на масив
+        items, keys, pos, d = self.items, self.keys, self._pos, self.d
+        item, key = items[i], keys[i]
+        while i > 0:
+            p = (i - 1) // d
+            if not key < keys[p]:
+                break
+            items[i], keys[i] = items[p], keys[p]
+            pos[items[i]] = i
+            i = p
+        items[i], keys[i] = item, key
+        pos[item] = i
+
+    def _sift_down(self, i: int) -> None:
+        items, keys, pos, d = self.items, self.keys, self._pos, self.d
+        n = len(items)
+        item, key = items[i], keys[i]
+        while True:
+            first = d * i + 1
+            if first >= n:
+                break
+            c, kc = first, keys[first]
+            for j in range(first + 1, min(first + d, n)):
+                if keys[j] < kc:
+                    c, kc = j, keys[j]
+            if not kc < key:
+                break
+            items[i], keys[i] = items[c], kc
+            pos[items[i]] = i
+            i = c
+        items[i], keys[i] = item, key
+        pos[item] = i
+
+
+def heap_layout(n: int, d: int = 2):
+    """
+    Координати вузлів масиву-купи чисто з індексів (векторно, без Node і рекурсії):
+    рівень i — floor(log2(i+1)), позиція на рівні p = i - (2**рівень - 1),
+    x = (2p + 1) / 2**рівень - 1 (крок 1/2**рівень, як у класичному малюнку купи), y = -рівень.
+    Для d-арної купи рівень L починається з індексу (d**L - 1) / (d - 1), а x = (2p + 1) / d**L - 1.
+    Повертає (x, y, level) як масиви NumPy.
+    """
+    idx = np.arange(n, dtype=np.int64)
+    if d == 2:
+        level = (np.frexp((idx + 1).astype(np.float64))[1] - 1).astype(np.int64)
+        first = (np.int64(1) << level) - 1
+        x = (2 * (idx - first) + 1) / np.exp2(level) - 1
+        return x, -level.astype(np.float64), level
+    firsts = [0]
+    while firsts[-1] < n:
+        firsts.append(firsts[-1] * d + 1)
+    firsts = np.array(firsts, dtype=np.int64)
+    level = np.searchsorted(firsts, idx, side="right") - 1
+    width = np.power(float(d), level)
+    x = (2 * (idx - firsts[level]) + 1) / width - 1
+    return x, -level.astype(np.float64), level
+
+
+def heap_colors(arr, color_rule=None, default="skyblue"):
+    """Кольори всіх вузлів масивом: палітра за рівнями — векторно, довільне правило — поелементно."""
+    n = len(arr)
+    palette = getattr(color_rule, "palette", None)
+    if palette is not None:
+        _, _, level = heap_layout(n, getattr(color_rule, "d", 2))
+        return np.asarray(palette, dtype=object)[level % len(palette)]
+    if color_rule is None:
+        return np.full(n, default, dtype=object)
+    return np.array([color_rule(i, v) for i, v in enumerate(arr)], dtype=object)
+
+
+def draw_heap(arr, color_rule=None, show=True, save=None, label_limit=127, figsize=(8, 5), d=2):
+    """
+    Рендер масиву-купи без дерева об'єктів і networkx: координати — heap_layout,
+    батько вузла i — (i-1)//d, малює task5.draw_tree_arrays (ребра — один LineCollection).
+    Підписи значень — лише для купи до label_limit елементів; більші купи малюються
+    групами маркерів за кольором. d — арність купи.
+    """
+    n = len(arr)
+    if n == 0:
         print("Порожня купа")
         return
-    draw_tree(root)
+    x, y, level = heap_layout(n, d)
+    parent = (np.arange(n) - 1) // d  # корінь: (0 - 1) // d = -1
+    fig = plt.figure(figsize=figsize)
+    # крок на нижньому рівні — 1, як у tidy_layout: за ним draw_tree_arrays добирає розмір вузлів
+    draw_tree_arrays(fig.add_axes((0, 0, 1, 1)), x * (float(d) ** level[-1] / 2), y, parent,
+                     list(heap_colors(arr, color_rule)), arr, label_limit=label_limit,
+                     marker_groups=n > label_limit)
+    if save:
+        fig.savefig(save, dpi=150)
+    if not show:
+        plt.close(fig)
+        return
+    try:
+        plt.show()
+    except KeyboardInterrupt:
+        plt.close("all")
+        print("\n[Перервано користувачем]")
+
+
+def visualize_heap(arr, color_rule=None, show=True, save=None, d=2):
+    """
+    Намалювати купу arr. Малює draw_heap() — координати з індексної арифметики,
+    без Node/uuid і networkx, тож і купи на 100k+ елементів рендеряться швидко.
+    color_rule: опційно, функція idx,val -> 'skyblue'/'tomato'/... для підсвітки.
+    d: арність купи (2 — heapq; для IndexedDaryHeap передайте heap.keys і heap.d).
+    """
+    draw_heap(arr, color_rule=color_rule, show=show, save=save, d=d)
+
+
+# коди операцій у трасі TracedHeap: (op, i, j). Операції відтворюють сам алгоритм heapq
+# з «діркою»: TAKE піднімає heap[i] у «руку», MOVE копіює heap[i] = heap[j], PUT кладе «руку» в heap[i]
+OP_CMP, OP_MOVE, OP_PUSH, OP_POP, OP_SET, OP_TAKE, OP_PUT = range(7)
+
+
+class TracedHeap:
+    """
+    Min-купа з семантикою heapq (push, pop, heapify, replace) і трасуванням.
+    trace=True: виконується той самий алгоритм, що й у heapq (_siftdown/_siftup
+    з діркою: спуск до листа й підйом назад), тож масив після кожної операції
+    збігається з heapq. Кожне порівняння й переміщення пишеться трійкою (op, i, j)
+    у попередньо виділений буфер array('q') (за потреби подвоюється),
+    значення push/replace — в окремий список values; лічильники comparisons/moves.
+    trace=False: операції делегуються прямо в heapq (C), накладні витрати ~0.
+    Початковий стан зберігається в initial — цього разом з трасою достатньо для replay.
+    """
+
+    def __init__(self, data=None, trace: bool = True, capacity: int = 1 << 16):
+        self.heap = list(data) if data is not None else []
+        self.initial = list(self.heap)
+        self.tracing = trace
+        self._buf = array("q", bytes(8 * 3 * capacity)) if trace else array("q")
+        self._len = 0
+        self.values: list = []
+        self.comparisons = self.moves = 0
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    @property
+    def trace(self) -> memoryview:
+        """Записана траса: плоский memoryview довжини 3·кількість_операцій."""
+        return memoryview(self._buf)[:self._len]
+
+    def _rec(self, op: int, i: int, j: int) -> None:
+        if self._len + 3 > len(self._buf):
+            self._buf.extend(array("q", bytes(8 * max(len(self._buf), 3))))  # подвоєння буфера
+        buf, k = self._buf, self._len
+        buf[k], buf[k + 1], buf[k + 2] = op, i, j
+        self._len = k + 3
+
+    def _siftdown(self, startpos: int, pos: int) -> None:
+        # heapq._siftdown: піднімаємо елемент з pos, поки він менший за батька
+        heap, rec = self.heap, self._rec
+        newitem = heap[pos]
+        rec(OP_TAKE, pos, pos)
+        while pos > startpos:
+            parentpos = (pos - 1) >> 1
+            self.comparisons += 1
+            rec(OP_CMP, pos, parentpos)
+            if newitem < heap[parentpos]:
+                heap[pos] = heap[parentpos]
+                self.moves += 1
+                rec(OP_MOVE, pos, parentpos)
+                pos = parentpos
+                continue
+            break
+        heap[pos] = newitem
+        rec(OP_PUT, pos, pos)
+
+    def _siftup(self, pos: int) -> None:
+        # heapq._siftup: меншу дитину піднімаємо в дірку до самого листа, потім _siftdown назад
+        heap, rec = self.heap, self._rec
+        endpos = len(heap)
+        startpos = pos
+        newitem = heap[pos]
+        rec(OP_TAKE, pos, pos)
+        childpos = 2 * pos + 1
+        while childpos < endpos:
+            rightpos = childpos + 1
+            if rightpos < endpos:
+                self.comparisons += 1
+                rec(OP_CMP, childpos, rightpos)
+                if not heap[childpos] < heap[rightpos]:
+                    childpos = rightpos
+            heap[pos] = heap[childpos]
+            self.moves += 1
+            rec(OP_MOVE, pos, childpos)
+            pos = childpos
+            childpos = 2 * pos + 1
+        heap[pos] = newitem
+        rec(OP_PUT, pos, pos)
+        self._siftdown(startpos, pos)
+
+    def heapify(self) -> None:
+        if not self.tracing:
+            heapq.heapify(self.heap)
+            return
+        for i in reversed(range(len(self.heap) // 2)):
+            self._siftup(i)
+
+    def push(self, item) -> None:
+        if not self.tracing:
+            heapq.heappush(self.heap, item)
+            return
+        self.values.append(item)
+        self.heap.append(item)
+        self._rec(OP_PUSH, len(self.heap) - 1, len(self.values) - 1)
+        self._siftdown(0, len(self.heap) - 1)
+
+    def pop(self):
+        if not self.tracing:
+            return heapq.heappop(self.heap)
+        h = self.heap
+        last = h.pop()
+        self._rec(OP_POP, len(h), 0)
+        if h:
+            top = h[0]
+            h[0] = last
+            self._rec(OP_PUT, 0, 0)
+            self._siftup(0)
+            return top
+        return last
+
+    def replace(self, item):
+        if not self.tracing:
+            return heapq.heapreplace(self.heap, item)
+        top = self.heap[0]
+        self.values.append(item)
+        self.heap[0] = item
+        self._rec(OP_SET, 0, len(self.values) - 1)
+        self._siftup(0)
+        return top
+
+
+def check_traced_heap(runs: int = 200, steps: int = 60, seed: int = 0) -> None:
+    """
+    Самоперевірка: на випадкових послідовностях heapify/push/pop/replace масив
+    TracedHeap(trace=True) після КОЖНОЇ операції збігається з heapq, а replay траси
+    (iter_heap_frames) відтворює той самий кінцевий стан. AssertionError — при розбіжності.
+    Не викликається ні при імпорті, ні в демо: запускайте вручну
+    (python -c "import task4; task4.check_traced_heap()").
+    """
+    import random
+
+    rnd = random.Random(seed)
+    for _ in range(runs):
+        data = [rnd.randrange(50) for _ in range(rnd.randrange(30))]
+        traced, ref = TracedHeap(data, capacity=16), list(data)
+        traced.heapify()
+        heapq.heapify(ref)
+        assert traced.heap == ref, "heapify"
+        for _ in range(steps):
+            op = rnd.randrange(3) if ref else 0
+            if op == 0:
+                item = rnd.randrange(50)
+                traced.push(item)
+                heapq.heappush(ref, item)
+            elif op == 1:
+                assert traced.pop() == heapq.heappop(ref), "pop"
+            else:
+                item = rnd.randrange(50)
+                assert traced.replace(item) == heapq.heapreplace(ref, item), "replace"
+            assert traced.heap == ref, ("push", "pop", "replace")[op]
+        state = list(traced.initial)
+        for state, _, _ in iter_heap_frames(traced, ops=range(7)):
+            pass
+        assert state == ref, "replay"
+
+
+def iter_heap_frames(traced: TracedHeap, ops=(OP_MOVE, OP_PUSH, OP_POP, OP_SET, OP_PUT)):
+    """
+    Replay: відновлює стани купи з initial + траси. Видає (стан, (i, j), op)
+    після кожної операції з ops (за замовчуванням — усі, що змінюють масив;
+    додайте OP_CMP, щоб бачити й порівняння). Стан — той самий список, оновлюваний на місці;
+    під час просіювання в ньому, як і в heapq, тимчасово дублюється зсунутий елемент.
+    """
+    h = list(traced.initial)
+    hand = None
+    t, values = traced.trace, traced.values
+    for k in range(0, len(t), 3):
+        op, i, j = t[k], t[k + 1], t[k + 2]
+        if op == OP_MOVE:
+            h[i] = h[j]
+        elif op == OP_TAKE:
+            hand = h[i]
+        elif op == OP_PUT:
+            h[i] = hand
+        elif op == OP_PUSH:
+            h.append(values[j])
+        elif op == OP_POP:
+            hand = h.pop()
+            i = j = 0
+        elif op == OP_SET:
+            h[i] = values[j]
+        if op in ops:
+            yield h, (i, j), op
+
+
+class _PixelLayer(Artist):
+    """Готовий RGBA-растр розміру фігури: малюється прямо renderer.draw_image, без ресемплінгу AxesImage."""
+
+    def __init__(self, rgba):
+        super().__init__()
+        self._rgba = np.ascontiguousarray(rgba[::-1])  # draw_image чекає рядки знизу вгору
+        self.set_zorder(-1)
+
+    def draw(self, renderer):
+        gc = renderer.new_gc()
+        renderer.draw_image(gc, 0, 0, self._rgba)
+        gc.restore()
+
+
+def _heap_replay_sizes(traced: TracedHeap):
+    """(найменша, найбільша) довжина купи за трасою — лише за PUSH/POP, без відтворення значень."""
+    n = n_min = n_max = len(traced.initial)
+    t = traced.trace
+    for k in range(0, len(t), 3):
+        if t[k] == OP_PUSH:
+            n += 1
+            n_max = max(n_max, n)
+        elif t[k] == OP_POP:
+            n -= 1
+            n_min = min(n_min, n)
+    return n_min, n_max
+
+
+def save_heap_replay(traced: TracedHeap, path: str, fps: int = 5, color_rule=None,
+                     highlight="tomato", max_frames: int = 1000, label_limit: int = 63, ops=None):
+    """
+    Рендерить replay траси у GIF (Pillow) або MP4 (ffmpeg) без вікна.
+    Кадри йдуть з iter_heap_frames прямо в FuncAnimation: на кадр зберігаються лише
+    довжина купи й підсвічена пара (значення — тільки коли показуються підписи),
+    тож пам'ять не росте з n·кадри. Вузли з індексами нижче найменшої довжини купи
+    за трасою не зникають ніколи — їхні ребра й маркери растеризуються один раз
+    у фонове зображення; на кадр перемальовується лише змінний «хвіст» купи.
+    """
+    from itertools import islice
+
+    from matplotlib import animation
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.collections import LineCollection
+    from matplotlib.figure import Figure
+
+    n_min, n_max = _heap_replay_sizes(traced)
+    n_max = max(n_max, 1)
+    small = n_max <= label_limit
+    frames = iter_heap_frames(traced, ops) if ops is not None else iter_heap_frames(traced)
+    frames = islice(((len(state), pair, tuple(state) if small else None)
+                     for state, pair, _ in frames), max_frames)
+    x, y, _ = heap_layout(n_max)
+    colors = heap_colors([0] * n_max, color_rule).astype(str)
+    edges = tree_edge_polyline(x, y, (np.arange(n_max) - 1) // 2)  # ребро дитини c — рядки 3(c-1)..3c-1
+    ms = (2500 / max(1, n_max.bit_length())) ** 0.5 if small else 2.0
+    lw = 0.8 if small else 0.3
+    pad_x, pad_y = 0.08 * (np.ptp(x) or 1), 0.08 * (np.ptp(y) or 1)
+    limits = (x.min() - pad_x, x.max() + pad_x, y.min() - pad_y, y.max() + pad_y)
+
+    def canvas():
+        fig = Figure(figsize=(8, 5))
+        FigureCanvasAgg(fig)
+        ax = fig.add_axes((0, 0, 1, 1))
+        ax.axis("off")
+        ax.set_xlim(limits[:2])
+        ax.set_ylim(limits[2:])
+        return fig, ax
+
+    def node_groups(ax, lo, hi):
+        return [(line, lo + idx) for line, idx in draw_marker_groups(ax, x[lo:hi], y[lo:hi], colors[lo:hi], ms)]
+
+    fig, ax = canvas()
+    if n_min > 0:
+        # статичний шар: ребра й вузли, що існують у кожному кадрі, — одна растеризація
+        bg_fig, bg_ax = canvas()
+        bg_fig.patch.set_alpha(0)
+        bg_ax.add_collection(LineCollection([edges[:3 * (n_min - 1)]], colors="black",
+                                            linewidths=lw, zorder=1))
+        node_groups(bg_ax, 0, n_min)
+        bg_fig.canvas.draw()
+        # фігури однакового розміру й dpi, осі на всю фігуру — фон кладеться піксель у піксель
+        fig.add_artist(_PixelLayer(np.asarray(bg_fig.canvas.buffer_rgba())))
+        ax.patch.set_visible(False)
+    lines = LineCollection([], colors="black", linewidths=lw, zorder=1)
+    ax.add_collection(lines)
+    groups = node_groups(ax, n_min, n_max)
+    marks, = ax.plot([], [], "o", color=highlight, markersize=ms, markeredgewidth=0, zorder=2.5)
+    texts = [ax.text(xi, yi, "", ha="center", va="center", fontsize=10, zorder=3) for xi, yi in zip(x, y)] \
+        if small else []
+    ax.set_xlim(limits[:2])
+    ax.set_ylim(limits[2:])
+
+    def update(frame):
+        size, (i, j), labels = frame
+        for line, idx in groups:
+            k = int(np.searchsorted(idx, size))
+            line.set_data(x[idx[:k]], y[idx[:k]])
+        pair = [p for p in {i, j} if p < size]
+        marks.set_data(x[pair], y[pair])
+        lines.set_segments([edges[3 * max(n_min - 1, 0):3 * max(size - 1, 0)]])
+        for idx, t in enumerate(texts):
+            t.set_text(str(labels[idx]) if idx < size else "")
+        return [marks, lines, *(line for line, _ in groups), *texts]
+
+    writer = animation_writer(path, fps)
+    anim = animation.FuncAnimation(fig, update, frames=frames, save_count=max_frames,
+                                   cache_frame_data=False, blit=False)
+    anim.save(path, writer=writer, dpi=fig.dpi)
 
 
-def level_color_rule_factory(palette):
+def level_color_rule_factory(palette, d=2):
     """
     Повертає функцію color_rule(i, val), яка фарбує вузол за РІВНЕМ.
-    Рівень вузла в масиві-купі з індексом i: floor(log2(i+1)).
+    Рівень вузла в масиві-купі з індексом i: floor(log2(i+1)); для d-арної купи —
+    найбільше L, для якого (d**L - 1) / (d - 1) <= i.
     """
     def color_rule(i, val):
-        level = int(math.log2(i + 1))
+        if d == 2:
+            level = int(math.log2(i + 1))
+        else:
+            level, first, width = 0, 0, 1
+            while i >= first + width:
+                first, width, level = first + width, width * d, level + 1
         return palette[level % len(palette)]
+    color_rule.palette = list(palette)  # дозволяє heap_colors рахувати кольори масивом
+    color_rule.d = d
     return color_rule
 
 
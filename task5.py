@@ -1,7 +1,7 @@
 import uuid
-from collections import deque
+from collections import OrderedDict, deque
 
-import networkx as nx
+import numpy as np
 import matplotlib.pyplot as plt
 
 
@@ -14,20 +14,219 @@ class Node:
         self.id = str(uuid.uuid4())
 
 
-def add_edges(graph, node, pos, x=0, y=0, layer=1):
-    if node is not None:
-        graph.add_node(node.id, color=node.color, label=node.val)
-        if node.left:
-            graph.add_edge(node.id, node.left.id)
-            l = x - 1 / 2 ** layer
-            pos[node.left.id] = (l, y - 1)
-            add_edges(graph, node.left, pos, x=l, y=y - 1, layer=layer + 1)
-        if node.right:
-            graph.add_edge(node.id, node.right.id)
-            r = x + 1 / 2 ** layer
-            pos[node.right.id] = (r, y - 1)
-            add_edges(graph, node.right, pos, x=r, y=y - 1, layer=layer + 1)
-    return graph
+def tidy_layout(children, sides=None, distance: float = 1.0):
+    """
+    Охайне розміщення дерева (Reingold–Tilford у формі Walker з O(n)-уточненням
+    Buchheim–Jünger–Leipert) без рекурсії: x-координати масивом NumPy.
+    children: списки дітей кожного вузла (зліва направо) у нумерації, де батько
+    має менший номер за дітей (напр. BFS), корінь — 0.
+    sides: для бінарних дерев — -1/+1 для лівої/правої дитини; єдина дитина
+    тоді зсувається на distance/2 у свій бік, а не стає під батьком.
+    Сусідні вузли одного рівня — не ближче distance; корінь — у x = 0.
+    """
+    n = len(children)
+    if n == 0:
+        return np.empty(0)
+    parent, number = [-1] * n, [0] * n
+    for v, kids in enumerate(children):
+        for i, w in enumerate(kids):
+            parent[w], number[w] = v, i
+    prelim, mod, mid = [0.0] * n, [0.0] * n, [0.0] * n
+    shift, change = [0.0] * n, [0.0] * n
+    thread, ancestor = [-1] * n, list(range(n))
+
+    def next_left(v):
+        kids = children[v]
+        return kids[0] if kids else thread[v]
+
+    def next_right(v):
+        kids = children[v]
+        return kids[-1] if kids else thread[v]
+
+    # перший прохід знизу вгору: діти мають більші номери, тож обробляються раніше батька
+    for v in range(n - 1, -1, -1):
+        kids = children[v]
+        if not kids:
+            continue
+        default, prev = kids[0], -1
+        for w in kids:
+            if prev < 0:
+                prelim[w] = mid[w]
+                prev = w
+                continue
+            prelim[w] = prelim[prev] + distance
+            if children[w]:
+                mod[w] = prelim[w] - mid[w]
+            # apportion: розсуваємо піддерево w від лівих сусідів за контурами
+            vir = vor = w
+            vil, vol = prev, kids[0]
+            sir = sor = mod[w]
+            sil, sol = mod[vil], mod[vol]
+            nr, nl = next_right(vil), next_left(vir)
+            while nr >= 0 and nl >= 0:
+                vil, vir, vol, vor = nr, nl, next_left(vol), next_right(vor)
+                ancestor[vor] = w
+                sh = (prelim[vil] + sil) - (prelim[vir] + sir) + distance
+                if sh > 0:
+                    a = ancestor[vil]
+                    wl = a if parent[a] == v else default
+                    part = sh / (number[w] - number[wl])
+                    change[w] -= part
+                    change[wl] += part
+                    shift[w] += sh
+                    prelim[w] += sh
+                    mod[w] += sh
+                    sir += sh
+                    sor += sh
+                sil += mod[vil]
+                sir += mod[vir]
+                sol += mod[vol]
+                sor += mod[vor]
+                nr, nl = next_right(vil), next_left(vir)
+            if nr >= 0 and next_right(vor) < 0:
+                thread[vor] = nr
+                mod[vor] += sil - sor
+            else:
+                if nl >= 0 and next_left(vol) < 0:
+                    thread[vol] = nl
+                    mod[vol] += sir - sol
+                default = w
+            prev = w
+        # execute_shifts: рівномірно розподіляємо зсуви між проміжними сусідами
+        sh = ch = 0.0
+        for w in reversed(kids):
+            prelim[w] += sh
+            mod[w] += sh
+            ch += change[w]
+            sh += shift[w] + ch
+        m = (prelim[kids[0]] + prelim[kids[-1]]) / 2
+        if len(kids) == 1 and sides is not None:
+            m -= sides[kids[0]] * distance / 2
+        mid[v] = m
+    prelim[0] = mid[0]
+    # другий прохід згори вниз: x = prelim + сума mod предків
+    acc = [0.0] * n
+    for v, kids in enumerate(children):
+        a = acc[v] + mod[v]
+        for w in kids:
+            acc[w] = a
+    x = np.add(prelim, acc)
+    return x - x[0]
+
+
+# розміщення залежить лише від форми дерева: кеш форма → (x, y), найновіші в кінці
+_LAYOUT_CACHE: "OrderedDict[bytes, tuple]" = OrderedDict()
+_LAYOUT_CACHE_SIZE = 32
+
+
+def _cached_layout(key: bytes, build):
+    """(x, y) за формою key; build() → (children, sides) викликається лише при промаху кешу."""
+    hit = _LAYOUT_CACHE.get(key)
+    if hit is not None:
+        _LAYOUT_CACHE.move_to_end(key)
+        return hit
+    children, sides = build()
+    x = tidy_layout(children, sides)
+    depth = np.zeros(len(children))
+    for v, kids in enumerate(children):
+        for w in kids:
+            depth[w] = depth[v] + 1
+    hit = _LAYOUT_CACHE[key] = (x, -depth)
+    if len(_LAYOUT_CACHE) > _LAYOUT_CACHE_SIZE:
+        _LAYOUT_CACHE.popitem(last=False)
+    return hit
+
+
+def tree_arrays(root):
+    """
+    Плоске представлення дерева для рендеру: вузли в порядку BFS і масиви NumPy
+    x, y (охайне розміщення tidy_layout, y = -глибина) та parent (індекс батька,
+    -1 — корінь). Працює з бінарними вузлами (left/right) і d-арними (children,
+    як у task4.build_heap_tree). Ітеративно; розміщення кешується за формою дерева,
+    тож повторне малювання того самого (або однаково влаштованого) дерева — лише обхід.
+    """
+    if root is None:
+        return [], np.empty(0), np.empty(0), np.empty(0, dtype=np.int64)
+    nodes, parent, children, sides, shape = [root], [-1], [], [0], bytearray()
+    i = 0
+    while i < len(nodes):
+        node = nodes[i]
+        kids = getattr(node, "children", None)
+        if kids is not None:
+            kids = [c for c in kids if c is not None]
+            pairs = [(c, 0) for c in kids]
+            shape += (len(kids) + 4).to_bytes(2, "little")
+        else:
+            pairs = [(c, s) for c, s in ((node.left, -1), (node.right, 1)) if c is not None]
+            shape += (bool(node.left) | bool(node.right) << 1).to_bytes(2, "little")
+        ids = []
+        for c, s in pairs:
+            ids.append(len(nodes))
+            nodes.append(c); parent.append(i); sides.append(s)
+        children.append(ids)
+        i += 1
+    x, y = _cached_layout(bytes(shape), lambda: (children, sides))
+    return nodes, x, y, np.array(parent, dtype=np.int64)
+
+
+def tree_edge_polyline(x, y, parent):
+    """
+    Усі ребра батько → дитина однією ламаною з NaN-розривами: рядки 3k..3k+2 —
+    ребро k-ї дитини за зростанням індексу. Один шлях замість окремого Path на ребро.
+    """
+    child = np.flatnonzero(parent >= 0)
+    edges = np.full((len(child), 3, 2), np.nan)
+    edges[:, 0, 0], edges[:, 0, 1] = x[parent[child]], y[parent[child]]
+    edges[:, 1, 0], edges[:, 1, 1] = x[child], y[child]
+    return edges.reshape(-1, 2)
+
+
+def draw_marker_groups(ax, x, y, colors, markersize, zorder=2):
+    """
+    Вузли по одному Line2D з маркерами на колір (colors — назви чи hex): для великих
+    дерев Agg малює їх значно швидше за scatter з кольором на точку.
+    Повертає [(Line2D, зростаючі індекси вузлів групи)].
+    """
+    colors = np.asarray(colors).astype(str)
+    groups = []
+    for name in dict.fromkeys(colors.tolist()):
+        idx = np.flatnonzero(colors == name)
+        line, = ax.plot(x[idx], y[idx], "o", color=name, markersize=markersize,
+                        markeredgewidth=0, zorder=zorder)
+        groups.append((line, idx))
+    return groups
+
+
+def draw_tree_arrays(ax, x, y, parent, colors, labels=None, node_size=2500, label_limit=63,
+                     marker_groups=False):
+    """
+    Малює дерево з готових масивів координат на ax: ребра — одна ламана з NaN-розривами
+    (LineCollection), вузли — один scatter, підписи — лише до label_limit вузлів.
+    Розмір вузлів зменшується, щоб сусіди (відстань 1) не перекривались.
+    Повертає scatter вузлів (для оновлення кольорів у анімації), а з marker_groups=True
+    вузли малюються draw_marker_groups і повертаються його групи.
+    """
+    from matplotlib.collections import LineCollection
+
+    n = len(x)
+    ax.axis("off")
+    w, h = ax.figure.get_size_inches()
+    unit = 72 * min(w / (np.ptp(x) + 1.2), h / (np.ptp(y) + 1.2)) if n else 0
+    size = max(min(node_size, (0.8 * unit) ** 2), 1.0)
+    if n > 1:
+        ax.add_collection(LineCollection([tree_edge_polyline(x, y, parent)], colors="black",
+                                         linewidths=1.0 if unit >= 4 else 0.3, zorder=1))
+    if marker_groups:
+        dots = draw_marker_groups(ax, x, y, colors, size ** 0.5)
+    else:
+        dots = ax.scatter(x, y, s=size, c=colors, zorder=2, edgecolors="none")
+    if labels is not None and n <= label_limit and unit >= 12:
+        fs = min(10.0, 0.35 * unit)
+        for xi, yi, text in zip(x, y, labels):
+            ax.text(xi, yi, str(text), ha="center", va="center", fontsize=fs, zorder=3)
+    ax.margins(0.08)
+    ax.autoscale_view()
+    return dots
 
 
 def draw_tree(tree_root, show=True):
@@ -36,15 +235,10 @@ def draw_tree(tree_root, show=True):
         print("Порожнє дерево — нічого малювати.")
         return
 
-    tree = nx.DiGraph()
-    pos = {tree_root.id: (0, 0)}
-    add_edges(tree, tree_root, pos)
-
-    colors = [n[1]["color"] for n in tree.nodes(data=True)]
-    labels = {n[0]: n[1]["label"] for n in tree.nodes(data=True)}
-
-    plt.figure(figsize=(8, 5))
-    nx.draw(tree, pos=pos, labels=labels, arrows=False, node_size=2500, node_color=colors)
+    nodes, x, y, parent = tree_arrays(tree_root)
+    fig = plt.figure(figsize=(8, 5))
+    draw_tree_arrays(fig.add_axes((0, 0, 1, 1)), x, y, parent,
+                     [n.color for n in nodes], [n.val for n in nodes])
 
     if show:
         try:
@@ -65,60 +259,492 @@ def _rgb_to_hex(rgb):
     return "#{:02x}{:02x}{:02x}".format(*rgb)
 
 
-def gradient_hex(n: int, start="#0b3d91", end="#a6d8ff"):
-    """Генерує n кольорів у hex від темного (start) до світлого (end)."""
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+
+def gradient_rgb(n: int, start="#0b3d91", end="#a6d8ff"):
+    """Градієнт з n кольорів масивом uint8 форми (n, 3) — одним векторним обчисленням."""
+    s = np.array(_hex_to_rgb(start), dtype=np.float64)
+    e = np.array(_hex_to_rgb(end), dtype=np.float64)
+    t = np.arange(n, dtype=np.float64) / max(n - 1, 1)
+    # np.rint, як і round(), округлює .5 до парного — результат збігається з поелементним
+    return np.rint(s + (e - s) * t[:, None]).astype(np.uint8)
+
+
+def gradient_hex_array(n: int, start="#0b3d91", end="#a6d8ff"):
+    """Те саме, що gradient_hex, але масивом NumPy рядків '#rrggbb' без циклу Python."""
     if n <= 0:
-        return []
+        return np.empty(0, dtype="<U7")
     if n == 1:
-        return [start]
-    s = _hex_to_rgb(start)
-    e = _hex_to_rgb(end)
-    out = []
-    for i in range(n):
-        t = i / (n - 1)
-        rgb = tuple(int(round(s[c] + (e[c] - s[c]) * t)) for c in range(3))
-        out.append(_rgb_to_hex(rgb))
-    return out
+        return np.array([start])
+    rgb = gradient_rgb(n, start, end)
+    out = np.empty((n, 7), dtype=np.uint8)
+    out[:, 0] = ord("#")
+    out[:, 1::2] = _HEX_DIGITS[rgb >> 4]
+    out[:, 2::2] = _HEX_DIGITS[rgb & 15]
+    return out.view("S7").ravel().astype("<U7")
 
 
-def order_dfs_iter(root: Node):
-    """Pre-order DFS: ітеративно, стек (LIFO)."""
-    if root is None:
-        return []
-    stack = [root]
-    order = []
-    seen = set()
+def gradient_hex(n: int, start="#0b3d91", end="#a6d8ff"):
+    """Генерує n кольорів у hex від темного (start) до світлого (end)."""
+    return gradient_hex_array(n, start, end).tolist()
+
+
+def iter_preorder(root: Node):
+    """Pre-order (DFS) генератором: стек (LIFO), вузли видаються одразу — без списку й seen."""
+    stack = [root] if root is not None else []
     while stack:
         node = stack.pop()
-        if id(node) in seen:
-            continue
-        seen.add(id(node))
-        order.append(node)
+        yield node
         # спершу правого — щоб лівий вийшов першим
         if node.right:
             stack.append(node.right)
         if node.left:
             stack.append(node.left)
-    return order
 
 
-def order_bfs_iter(root: Node):
-    """BFS: ітеративно, черга (FIFO)."""
-    if root is None:
-        return []
-    q = deque([root])
-    order = []
-    seen = set([id(root)])
+def iter_inorder(root: Node):
+    """In-order генератором: стек лівого ланцюжка, пам'ять O(висота)."""
+    stack, node = [], root
+    while stack or node is not None:
+        while node is not None:
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        yield node
+        node = node.right
+
+
+def iter_postorder(root: Node):
+    """Post-order генератором: один стек і останній видний вузол, пам'ять O(висота)."""
+    stack, node, last = [], root, None
+    while stack or node is not None:
+        while node is not None:
+            stack.append(node)
+            node = node.left
+        top = stack[-1]
+        if top.right is not None and top.right is not last:
+            node = top.right
+        else:
+            last = stack.pop()
+            yield last
+
+
+def iter_levels(root: Node):
+    """BFS пакетами: видає список вузлів кожного рівня (корінь — рівень 0)."""
+    level = [root] if root is not None else []
+    while level:
+        yield level
+        level = [c for node in level for c in (node.left, node.right) if c is not None]
+
+
+def iter_level_order(root: Node):
+    """BFS генератором: черга (FIFO), вузли видаються в міру зняття з черги."""
+    q = deque([root] if root is not None else [])
     while q:
         node = q.popleft()
-        order.append(node)
-        if node.left and id(node.left) not in seen:
-            seen.add(id(node.left))
+        yield node
+        if node.left:
             q.append(node.left)
-        if node.right and id(node.right) not in seen:
-            seen.add(id(node.right))
+        if node.right:
             q.append(node.right)
-    return order
+
+
+def _morris_step(cur: Node, preorder: bool):
+    """Один крок обходу Морріса: (наступний cur, вузол для видачі або None)."""
+    if cur.left is None:
+        return cur.right, cur
+    pred = cur.left
+    while pred.right is not None and pred.right is not cur:
+        pred = pred.right
+    if pred.right is None:
+        pred.right = cur  # тимчасова нитка назад до cur
+        return cur.left, (cur if preorder else None)
+    pred.right = None  # ліве піддерево пройдено — прибираємо нитку
+    return cur.right, (None if preorder else cur)
+
+
+def _morris(root: Node, preorder: bool):
+    cur = root
+    try:
+        while cur is not None:
+            cur, node = _morris_step(cur, preorder)
+            if node is not None:
+                yield node
+    finally:
+        # споживач зупинився раніше: дотягуємо обхід без видачі, щоб прибрати всі нитки
+        while cur is not None:
+            cur, _ = _morris_step(cur, preorder)
+
+
+def morris_inorder(root: Node):
+    """
+    In-order обходом Морріса: O(1) додаткової пам'яті (ні стека, ні черги).
+    Під час обходу дерево тимчасово прошивається через порожні right-посилання;
+    після завершення (або закриття генератора) структура відновлюється.
+    Не змінюйте дерево, поки генератор активний.
+    """
+    return _morris(root, preorder=False)
+
+
+def morris_preorder(root: Node):
+    """Pre-order обходом Морріса: O(1) додаткової пам'яті; застереження — як у morris_inorder."""
+    return _morris(root, preorder=True)
+
+
+def order_dfs_iter(root: Node):
+    """Pre-order DFS: ітеративно, стек (LIFO). Список поверх iter_preorder."""
+    return list(iter_preorder(root))
+
+
+def order_bfs_iter(root: Node):
+    """BFS: ітеративно, черга (FIFO). Список поверх iter_level_order."""
+    return list(iter_level_order(root))
+
+
+# режими обходу для анімації: назва → генератор вузлів
+TRAVERSALS = {
+    "bfs": iter_level_order,
+    "dfs": iter_preorder,
+    "preorder": iter_preorder,
+    "inorder": iter_inorder,
+    "postorder": iter_postorder,
+    "morris_inorder": morris_inorder,
+    "morris_preorder": morris_preorder,
+}
+
+
+class ArrayTree:
+    """
+    Компактне бінарне дерево «структурою масивів»: left/right — int32-масиви
+    індексів дітей (-1 — немає), val — масив значень, color — індекси в palette
+    (список або масив hex-рядків). Мільйон вузлів займає ~20 МБ замість сотень МБ для Node
+    з uuid і __dict__. Обходи й глибини рахуються рівнями над масивами (векторно);
+    для глибоких дерев (висота > 16 + n/DEEP_RATIO) — явним стеком за O(n),
+    бо на виродженому дереві рівнів стільки ж, скільки вузлів.
+    """
+
+    DEEP_RATIO = 64
+
+    def __init__(self, left, right, val, color=None, palette=None, root: int = 0):
+        self.left = np.asarray(left, dtype=np.int32)
+        self.right = np.asarray(right, dtype=np.int32)
+        self.val = np.asarray(val)
+        n = len(self.left)
+        self.palette = palette if palette is not None else ["#87ceeb"]
+        self.color = np.zeros(n, dtype=np.int32) if color is None else np.asarray(color, dtype=np.int32)
+        self.root = root if n else -1
+
+    def __len__(self) -> int:
+        return len(self.left)
+
+    @classmethod
+    def from_node(cls, root: Node) -> "ArrayTree":
+        """Node-дерево → ArrayTree; вузли нумеруються в порядку BFS (корінь — 0)."""
+        nodes = list(iter_level_order(root))
+        index = {id(node): i for i, node in enumerate(nodes)}
+        left = np.fromiter((index[id(x.left)] if x.left is not None else -1 for x in nodes),
+                           dtype=np.int32, count=len(nodes))
+        right = np.fromiter((index[id(x.right)] if x.right is not None else -1 for x in nodes),
+                            dtype=np.int32, count=len(nodes))
+        palette = {}
+        color = np.fromiter((palette.setdefault(x.color, len(palette)) for x in nodes),
+                            dtype=np.int32, count=len(nodes))
+        vals = [x.val for x in nodes]
+        val = np.array(vals) if vals and all(isinstance(v, (int, float)) for v in vals) else None
+        if val is None or val.dtype == object:
+            val = np.empty(len(vals), dtype=object)  # змішані/нечислові значення — object-масив
+            val[:] = vals
+        return cls(left, right, val, color, list(palette) or None)
+
+    def to_node(self) -> Node:
+        """ArrayTree → Node-дерево (колір кожного вузла — palette[color[i]])."""
+        if self.root < 0:
+            return None
+        vals, colors = self.val.tolist(), self.color.tolist()
+        nodes = [Node(v, self.palette[c]) for v, c in zip(vals, colors)]
+        for i, (l, r) in enumerate(zip(self.left.tolist(), self.right.tolist())):
+            if l >= 0:
+                nodes[i].left = nodes[l]
+            if r >= 0:
+                nodes[i].right = nodes[r]
+        return nodes[self.root]
+
+    def _level_list(self):
+        """Рівні векторно або None, якщо їх більше за 16 + n/DEEP_RATIO (глибоке дерево)."""
+        limit = 16 + len(self) // self.DEEP_RATIO
+        levels = []
+        level = np.array([self.root] if self.root >= 0 else [], dtype=np.int32)
+        while len(level):
+            if len(levels) == limit:
+                return None
+            levels.append(level)
+            kids = np.column_stack((self.left[level], self.right[level])).ravel()
+            level = kids[kids >= 0]
+        return levels
+
+    def _preorder_depths(self):
+        """Прямий порядок і глибини явним стеком над left/right — O(n) для будь-якої висоти."""
+        left, right = self.left.tolist(), self.right.tolist()
+        depth = [-1] * len(self)
+        pre, stack = [], []
+        if self.root >= 0:
+            depth[self.root] = 0
+            stack.append(self.root)
+        while stack:
+            v = stack.pop()
+            pre.append(v)
+            d = depth[v] + 1
+            r, l = right[v], left[v]
+            if r >= 0:
+                depth[r] = d
+                stack.append(r)
+            if l >= 0:
+                depth[l] = d
+                stack.append(l)
+        return np.array(pre, dtype=np.int32), np.array(depth, dtype=np.int32)
+
+    def _dfs_stack(self, kind: str):
+        """DFS-порядок явним стеком (шлях для глибоких дерев)."""
+        left, right = self.left.tolist(), self.right.tolist()
+        out, stack, cur = [], [], self.root
+        if kind == "in":
+            while stack or cur >= 0:
+                while cur >= 0:
+                    stack.append(cur)
+                    cur = left[cur]
+                cur = stack.pop()
+                out.append(cur)
+                cur = right[cur]
+        elif cur >= 0:
+            # post — дзеркальний прямий (корінь, праве, ліве), прочитаний задом наперед
+            first, second = (right, left) if kind == "pre" else (left, right)
+            stack.append(cur)
+            while stack:
+                v = stack.pop()
+                out.append(v)
+                if first[v] >= 0:
+                    stack.append(first[v])
+                if second[v] >= 0:
+                    stack.append(second[v])
+            if kind == "post":
+                out.reverse()
+        return np.array(out, dtype=np.int32)
+
+    def _deep_bfs(self):
+        """BFS-порядок і межі рівнів через стек: на рівні прямий порядок — це зліва направо."""
+        pre, depth = self._preorder_depths()
+        d = depth[pre]
+        by_level = np.argsort(d, kind="stable")
+        return pre[by_level], np.flatnonzero(np.diff(d[by_level])) + 1
+
+    def levels(self):
+        """BFS пакетами: масив індексів кожного рівня (зліва направо)."""
+        levels = self._level_list()
+        if levels is None:
+            levels = np.split(*self._deep_bfs())
+        yield from levels
+
+    def bfs_order(self):
+        """Порядок BFS масивом індексів."""
+        levels = self._level_list()
+        if levels is None:
+            return self._deep_bfs()[0]
+        return np.concatenate(levels) if levels else np.empty(0, dtype=np.int32)
+
+    def depths(self):
+        """Глибина кожного вузла (-1 — недосяжний з кореня)."""
+        levels = self._level_list()
+        if levels is None:
+            return self._preorder_depths()[1]
+        depth = np.full(len(self), -1, dtype=np.int32)
+        for d, level in enumerate(levels):
+            depth[level] = d
+        return depth
+
+    def subtree_sizes(self):
+        """Розміри піддерев: знизу вгору по рівнях, векторно (глибокі — одним зворотним проходом)."""
+        return self._subtree_sizes(self._level_list())
+
+    def _subtree_sizes(self, levels):
+        if levels is None:
+            # size[-1] — фіктивний нуль для відсутньої дитини (-1)
+            left, right = self.left.tolist(), self.right.tolist()
+            size = [0] * (len(self) + 1)
+            for v in reversed(self._preorder_depths()[0].tolist()):
+                size[v] = 1 + size[left[v]] + size[right[v]]
+            return np.array(size[:-1], dtype=np.int64)
+        size = np.zeros(len(self), dtype=np.int64)
+        for level in reversed(levels):
+            l, r = self.left[level], self.right[level]
+            size[level] = 1 + np.where(l >= 0, size[l], 0) + np.where(r >= 0, size[r], 0)
+        return size
+
+    def dfs_order(self, kind: str = "pre"):
+        """
+        Порядок DFS ('pre', 'in' або 'post') масивом індексів — без стека:
+        з розмірів піддерев кожному вузлу зверху вниз по рівнях призначається
+        початок його діапазону в порядку (offset), звідки й позиція вузла.
+        Глибокі дерева обходяться явним стеком.
+        """
+        if kind not in ("pre", "in", "post"):
+            raise ValueError("kind має бути 'pre', 'in' або 'post'")
+        levels = self._level_list()
+        if levels is None:
+            return self._dfs_stack(kind)
+        size = self._subtree_sizes(levels)
+        offset = np.zeros(len(self), dtype=np.int64)
+        pos = np.zeros(len(self), dtype=np.int64)
+        for level in levels:
+            l, r = self.left[level], self.right[level]
+            sl = np.where(l >= 0, size[l], 0)
+            off = offset[level]
+            if kind == "pre":
+                pos[level] = off
+                lo, ro = off + 1, off + 1 + sl
+            elif kind == "in":
+                pos[level] = off + sl
+                lo, ro = off, off + sl + 1
+            else:
+                pos[level] = off + size[level] - 1
+                lo, ro = off, off + sl
+            has_l, has_r = l >= 0, r >= 0
+            offset[l[has_l]] = lo[has_l]
+            offset[r[has_r]] = ro[has_r]
+        idx = np.concatenate(levels) if levels else np.empty(0, dtype=np.int32)
+        order = np.empty(len(idx), dtype=np.int32)
+        order[pos[idx]] = idx
+        return order
+
+    def layout(self):
+        """
+        Охайне розміщення (tidy_layout): масиви x, y, індексовані як вузли
+        (NaN — недосяжні з кореня). Кеш за формою спільний з tree_arrays.
+        """
+        order = self.bfs_order()
+        rank = np.full(len(self), -1, dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        l, r = self.left[order], self.right[order]
+        shape = ((l >= 0) | (r >= 0) << 1).astype("<u2")
+
+        def build():
+            lr, rr = np.where(l >= 0, rank[l], -1).tolist(), np.where(r >= 0, rank[r], -1).tolist()
+            children = [[c for c in pair if c >= 0] for pair in zip(lr, rr)]
+            sides = np.zeros(len(order), dtype=np.int8)
+            sides[rank[l[l >= 0]]] = -1
+            sides[rank[r[r >= 0]]] = 1
+            return children, sides.tolist()
+
+        xb, yb = _cached_layout(shape.tobytes(), build)
+        x = np.full(len(self), np.nan)
+        y = np.full(len(self), np.nan)
+        x[order], y[order] = xb, yb
+        return x, y
+
+    def color_by_order(self, order, start="#0b3d91", end="#a6d8ff") -> None:
+        """
+        Фарбує вузли градієнтом за номером відвідування: palette — градієнт
+        плюс базовий колір для невідвіданих, color[order[k]] = k.
+        """
+        order = np.asarray(order)
+        self.palette = np.append(gradient_hex_array(len(order), start=start, end=end), "#87ceeb")
+        self.color = np.full(len(self), len(order), dtype=np.int32)
+        self.color[order] = np.arange(len(order), dtype=np.int32)
+
+    def colors(self):
+        """Кольори всіх вузлів масивом рядків (palette[color])."""
+        return np.asarray(self.palette)[self.color]
+
+
+def _traversal_order(root: Node, mode: str):
+    traverse = TRAVERSALS.get(mode.lower())
+    if traverse is None:
+        raise ValueError(f"mode має бути одним з: {', '.join(TRAVERSALS)}")
+    return list(traverse(root))
+
+
+def animate_traversal(
+    root: Node,
+    mode: str = "bfs",
+    fig=None,
+    interval: float = 800,
+    start="#0b3d91",
+    end="#a6d8ff",
+    nodes_per_frame: int = 1,
+    label_limit: int = 63,
+    blit: bool = True,
+    repeat: bool = False,
+):
+    """
+    Анімація обходу з персистентною фігурою: розміщення (tree_arrays), ребра,
+    вузли й підписи (draw_tree_arrays) будуються один раз; кадр лише оновлює масив
+    кольорів scatter — O(n) на кадр замість перебудови графа й фігури.
+    fig: готова фігура (за замовчуванням — нова plt.figure); interval — мс між кадрами.
+    nodes_per_frame: скільки вузлів фарбувати за кадр (для великих дерев).
+    Повертає FuncAnimation — тримайте посилання, поки анімація потрібна.
+    По завершенні node.color кожного вузла — його колір з градієнта.
+    """
+    from matplotlib import animation
+    from matplotlib.colors import to_rgba_array
+
+    nodes, x, y, parent = tree_arrays(root)
+    n = len(nodes)
+    order = _traversal_order(root, mode)
+    index = {id(node): i for i, node in enumerate(nodes)}
+    seq = np.fromiter((index[id(node)] for node in order), dtype=np.int64, count=len(order))
+    grad = gradient_hex(len(order), start=start, end=end)
+    grad_rgba = to_rgba_array(grad) if grad else np.empty((0, 4))
+    face = to_rgba_array(["#87ceeb"] * n)
+    for node, c in zip(order, grad):
+        node.color = c
+
+    if fig is None:
+        fig = plt.figure(figsize=(8, 5))
+    dots = draw_tree_arrays(fig.add_axes((0, 0, 1, 1)), x, y, parent, face,
+                            [node.val for node in nodes], label_limit=label_limit)
+
+    step = max(1, nodes_per_frame)
+    frames = -(-len(seq) // step)
+
+    def update(k):
+        upto = min((k + 1) * step, len(seq))
+        face[seq[:upto]] = grad_rgba[:upto]
+        dots.set_facecolors(face)
+        return (dots,)
+
+    return animation.FuncAnimation(fig, update, frames=frames, interval=interval,
+                                   blit=blit, repeat=repeat)
+
+
+def animation_writer(path: str, fps: int):
+    """Writer для FuncAnimation.save за розширенням: .mp4 — ffmpeg, інакше GIF через Pillow."""
+    from matplotlib import animation
+
+    if path.lower().endswith(".mp4"):
+        if not animation.writers.is_available("ffmpeg"):
+            raise RuntimeError("для MP4 потрібен ffmpeg у PATH; збережіть як .gif")
+        return animation.FFMpegWriter(fps=fps)
+    return animation.PillowWriter(fps=fps)
+
+
+def save_traversal(root: Node, path: str, mode: str = "bfs", fps: int = 5,
+                   start="#0b3d91", end="#a6d8ff", nodes_per_frame: int = 1, figsize=(8, 5)):
+    """
+    Експорт анімації обходу у GIF (Pillow) або MP4 (ffmpeg) без дисплея:
+    фігура — matplotlib.figure.Figure на Agg-канві, pyplot не потрібен.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    if root is None:
+        print("Порожнє дерево — нічого малювати.")
+        return
+    writer = animation_writer(path, fps)
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    anim = animate_traversal(root, mode, fig=fig, start=start, end=end,
+                             nodes_per_frame=nodes_per_frame, blit=False)
+    anim.save(path, writer=writer)
 
 
 def visualize_traversal(
@@ -131,49 +757,27 @@ def visualize_traversal(
 ):
     """
     Показує кроки обходу дерева з фарбуванням:
-      mode: 'bfs' або 'dfs'
+      mode: 'bfs', 'dfs' або інший ключ TRAVERSALS ('inorder', 'postorder', 'morris_inorder', ...)
       pause: затримка між кроками (секунди)
       start/end: межі градієнта у hex
+    Фігура одна на весь обхід (animate_traversal): кадр оновлює лише кольори вузлів.
     """
     if root is None:
         print("Порожнє дерево — нічого малювати.")
         return
 
-    if mode.lower() == "bfs":
-        order = order_bfs_iter(root)
-    elif mode.lower() == "dfs":
-        order = order_dfs_iter(root)
-    else:
-        raise ValueError("mode має бути 'bfs' або 'dfs'")
-
-    colors = gradient_hex(len(order), start=start, end=end)
-
-    def reset_colors(n: Node):
-        q = deque([n])
-        seen = set([id(n)])
-        while q:
-            cur = q.popleft()
-            cur.color = "#87ceeb"
-            if cur.left and id(cur.left) not in seen:
-                seen.add(id(cur.left)); q.append(cur.left)
-            if cur.right and id(cur.right) not in seen:
-                seen.add(id(cur.right)); q.append(cur.right)
-
-    reset_colors(root)
-
-    # покрокове фарбування
-    for i, node in enumerate(order):
-        node.color = colors[i]
-        draw_tree(root, show=False)
-        plt.pause(pause)
-        plt.close("all")
-
-    if block_final:
-        draw_tree(root)
-    else:
-        draw_tree(root, show=False)
-        plt.pause(2.0)
-        plt.close("all")
+    fig = plt.figure(figsize=(8, 5))
+    anim = animate_traversal(root, mode, fig=fig, interval=pause * 1000, start=start, end=end)
+    try:
+        if block_final:
+            plt.show()
+        else:
+            plt.show(block=False)
+            plt.pause(pause * sum(1 for _ in order_bfs_iter(root)) + 2.0)
+    except KeyboardInterrupt:
+        print("\n[Перервано користувачем]")
+    finally:
+        plt.close(fig)
 
 
 if __name__ == "__main__":
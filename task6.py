@@ -1,5 +1,10 @@
+from collections import OrderedDict
+from functools import reduce
+from math import gcd
 from typing import Dict, List, Tuple
 
+import numpy as np
+
 items = {
     "pizza":     {"cost": 50, "calories": 300},
     "hamburger": {"cost": 40, "calories": 250},
@@ -32,44 +37,202 @@ def greedy_algorithm(items: Dict[str, Dict[str, int]], budget: int) -> List[str]
     return chosen
 
 
+def _knapsack_row(costs, values, cap: int, dtype, decisions=None):
+    """
+    Останній рядок 0/1-рюкзака для місткостей 0..cap: один масив NumPy,
+    що оновлюється на місці зсунутим максимумом dp[c:] = max(dp[c:], dp[:-c] + v).
+    dp[w] — найкраща цінність при вартості <= w. Якщо передано список decisions,
+    для кожного предмета в нього дописується упакований бітсет рішень «брати»
+    (біт j — місткість c + j; None — предмет не вміщується).
+    """
+    dp = np.zeros(cap + 1, dtype=dtype)
+    for c, v in zip(costs, values):
+        if c > cap:
+            if decisions is not None:
+                decisions.append(None)
+            continue
+        if c == 0:
+            take = np.full(cap + 1, v > 0)
+            if v > 0:
+                dp += v
+        else:
+            cand = dp[:cap + 1 - c] + v
+            take = cand > dp[c:]  # строго більше: за рівності предмет не береться, як у повній таблиці
+            np.maximum(dp[c:], cand, out=dp[c:])
+        if decisions is not None:
+            decisions.append(np.packbits(take))
+    return dp
+
+
+def _backtrack(costs, decisions, w: int) -> List[int]:
+    """Відновлення вибору з бітсетів рішень: від останнього предмета до першого."""
+    chosen = []
+    for k in range(len(costs) - 1, -1, -1):
+        bits, c = decisions[k], costs[k]
+        if bits is None or w < c:
+            continue
+        j = w - c
+        if (bits[j >> 3] >> (7 - (j & 7))) & 1:
+            chosen.append(k)
+            w -= c
+    chosen.reverse()
+    return chosen
+
+
+def _scale_costs(costs, budget: int):
+    """Ділить вартості й бюджет на НСД вартостей — вісь бюджету коротшає в НСД разів."""
+    if any(c < 0 for c in costs):
+        raise ValueError("вартості мають бути невід'ємними")
+    g = reduce(gcd, (c for c in costs if c > 0), 0) or 1
+    return [c // g for c in costs], budget // g, g
+
+
+def knapsack_01(costs, values, budget: int, max_decision_bytes: int = 1 << 27) -> Tuple[float, List[int]]:
+    """
+    0/1 рюкзак: (найкраща сумарна цінність, індекси обраних предметів за зростанням).
+    Вартості — цілі невід'ємні; спершу діляться на їхній НСД. Кожен предмет —
+    одне векторне оновлення рядка NumPy (пам'ять рядка O(budget)), вибір
+    відновлюється з упакованих бітсетів рішень (n·budget/8 байт замість n·budget
+    цілих). Якщо бітсети перевищують max_decision_bytes, задача ділиться
+    навпіл за предметами у стилі Гіршберга: рядок першої половини «вперед»,
+    другої — окремо, найкраща точка розподілу бюджету w* = argmax F[w] + G[W-w],
+    і половини розв'язуються незалежно — пам'ять O(budget), час ~2× від одного проходу.
+    """
+    costs = list(costs)
+    values = list(values)
+    if budget < 0 or not costs:
+        return 0, []
+    scaled, cap, _ = _scale_costs(costs, budget)
+    dtype = np.int64 if all(isinstance(v, (int, np.integer)) for v in values) else np.float64
+
+    chosen: List[int] = []
+    stack = [(list(range(len(costs))), cap)]
+    while stack:
+        idx, w = stack.pop()
+        w = min(w, sum(scaled[i] for i in idx))
+        sub_c = [scaled[i] for i in idx]
+        sub_v = [values[i] for i in idx]
+        if len(idx) <= 1 or len(idx) * (w + 1) / 8 <= max_decision_bytes:
+            decisions: list = []
+            _knapsack_row(sub_c, sub_v, w, dtype, decisions)
+            chosen.extend(idx[k] for k in _backtrack(sub_c, decisions, w))
+            continue
+        mid = len(idx) // 2
+        f = _knapsack_row(sub_c[:mid], sub_v[:mid], w, dtype)
+        g = _knapsack_row(sub_c[mid:], sub_v[mid:], w, dtype)
+        split = int(np.argmax(f + g[::-1]))
+        stack.append((idx[mid:], w - split))
+        stack.append((idx[:mid], split))
+    chosen.sort()
+    return sum(values[i] for i in chosen), chosen
+
+
 def dynamic_programming(items: Dict[str, Dict[str, int]], budget: int) -> List[str]:
     """
     0/1 Knapsack (кожну страву можна взяти не більше одного разу).
     Оптимально максимізує калорії при обмеженні вартості (<= budget).
-    Час: O(N * budget), пам'ять: O(N * budget) для простоти; вміє відновлювати вибір.
+    Розв'язує knapsack_01: час O(N * budget / НСД вартостей) векторно,
+    пам'ять — один рядок плюс бітсет рішень; вміє відновлювати вибір.
     """
     names = list(items.keys())
     costs = [items[n]["cost"] for n in names]
     cals  = [items[n]["calories"] for n in names]
-    n = len(names)
-
-    # dp[i][w] = макс. калорій із перших i предметів при бюджеті w
-    dp = [[0] * (budget + 1) for _ in range(n + 1)]
-
-    # заповнення
-    for i in range(1, n + 1):
-        ci, vi = costs[i - 1], cals[i - 1]
-        for w in range(budget + 1):
-            dp[i][w] = dp[i - 1][w]
-            if ci <= w:
-                cand = dp[i - 1][w - ci] + vi
-                if cand > dp[i][w]:
-                    dp[i][w] = cand
-
-    res: List[str] = []
-    w = budget
-    for i in range(n, 0, -1):
-        if dp[i][w] != dp[i - 1][w]:
-            res.append(names[i - 1])
-            w -= costs[i - 1]
-    res.reverse()
-    return res
+    _, chosen = knapsack_01(costs, cals, budget)
+    return [names[i] for i in chosen]
+
+
+class KnapsackCurve:
+    """
+    Розв'язок 0/1 рюкзака одразу для всіх бюджетів 0..max_budget за один прохід:
+    останній рядок DP для max_budget уже містить оптимум для кожного меншого бюджету.
+    curve[b] — максимальні калорії при бюджеті b (масив NumPy);
+    items_for(b) — відновлення набору страв для будь-якого b на вимогу
+    (з бітсета рішень, а якщо він не вміщується в max_decision_bytes — через knapsack_01
+    з кешуванням відповіді).
+    """
+
+    def __init__(self, items: Dict[str, Dict[str, int]], max_budget: int, max_decision_bytes: int = 1 << 27):
+        if max_budget < 0:
+            raise ValueError("max_budget має бути невід'ємним")
+        self.names = list(items.keys())
+        self.costs = [items[n]["cost"] for n in self.names]
+        self.cals = [items[n]["calories"] for n in self.names]
+        self.max_budget = max_budget
+        self._scaled, cap, self._g = _scale_costs(self.costs, max_budget)
+        self._cap = min(cap, sum(self._scaled))
+        dtype = np.int64 if all(isinstance(v, (int, np.integer)) for v in self.cals) else np.float64
+        fits = len(self.names) * (self._cap + 1) / 8 <= max_decision_bytes
+        self._decisions = [] if fits else None
+        row = _knapsack_row(self._scaled, self.cals, self._cap, dtype, self._decisions)
+        self.curve = row[np.minimum(np.arange(max_budget + 1) // self._g, self._cap)]
+        self._picks: Dict[int, List[int]] = {}
+
+    @property
+    def nbytes(self) -> int:
+        """Пам'ять кривої: масив curve плюс бітсети рішень (якщо зберігаються)."""
+        bits = sum(b.nbytes for b in self._decisions if b is not None) if self._decisions else 0
+        return self.curve.nbytes + bits
+
+    def _check(self, budget: int) -> None:
+        if not 0 <= budget <= self.max_budget:
+            raise ValueError(f"бюджет {budget} поза межами 0..{self.max_budget}")
+
+    def calories(self, budget: int):
+        """Оптимальні калорії для бюджету budget — O(1)."""
+        self._check(budget)
+        return self.curve[budget].item()
+
+    def items_for(self, budget: int) -> List[str]:
+        """Оптимальний набір страв для бюджету budget (той самий, що й dynamic_programming)."""
+        self._check(budget)
+        w = min(budget // self._g, self._cap)
+        if self._decisions is not None:
+            chosen = _backtrack(self._scaled, self._decisions, w)
+        else:
+            chosen = self._picks.get(w)
+            if chosen is None:
+                chosen = self._picks[w] = knapsack_01(self.costs, self.cals, budget)[1]
+        return [self.names[i] for i in chosen]
+
+
+# кеш кривих за набором страв: ключ — кортеж (назва, вартість, калорії), найновіші в кінці;
+# обмежений і кількістю, і сумарним nbytes (бітсети рішень можуть сягати max_decision_bytes)
+_CURVE_CACHE: "OrderedDict[tuple, KnapsackCurve]" = OrderedDict()
+_CURVE_CACHE_SIZE = 16
+_CURVE_CACHE_BYTES = 1 << 28
+
+
+def knapsack_curve(items: Dict[str, Dict[str, int]], max_budget: int) -> KnapsackCurve:
+    """
+    KnapsackCurve для items до max_budget із кешем за набором страв:
+    повторні запити з тим самим меню й бюджетом не більшим за вже розв'язаний
+    не перераховують DP. Змінене меню (ціни, калорії, склад) — новий ключ.
+    Кеш тримає до _CURVE_CACHE_SIZE кривих і не більше _CURVE_CACHE_BYTES байтів
+    (найдавніші витісняються); крива, більша за весь бюджет, не кешується.
+    """
+    key = tuple((n, v["cost"], v["calories"]) for n, v in items.items())
+    curve = _CURVE_CACHE.get(key)
+    if curve is not None and curve.max_budget >= max_budget:
+        _CURVE_CACHE.move_to_end(key)
+        return curve
+    _CURVE_CACHE.pop(key, None)
+    curve = KnapsackCurve(items, max_budget)
+    if curve.nbytes > _CURVE_CACHE_BYTES:
+        return curve
+    _CURVE_CACHE[key] = curve
+    total = sum(c.nbytes for c in _CURVE_CACHE.values())
+    while len(_CURVE_CACHE) > _CURVE_CACHE_SIZE or total > _CURVE_CACHE_BYTES:
+        total -= _CURVE_CACHE.popitem(last=False)[1].nbytes
+    return curve
 
 
 if __name__ == "__main__":
-    for B in (40, 50, 65, 75, 90):
+    budgets = (40, 50, 65, 75, 90)
+    # один прохід DP до найбільшого бюджету — відповіді для решти беремо з кривої
+    curve = knapsack_curve(items, max(budgets))
+    for B in budgets:
         g = greedy_algorithm(items, B)
-        d = dynamic_programming(items, B)
+        d = curve.items_for(B)
 
         def total(lst: List[str]) -> Tuple[int, int]:
             cost = sum(items[x]["cost"] for x in lst)